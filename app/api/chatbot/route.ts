@@ -1,5 +1,8 @@
 import { NextRequest, NextResponse } from "next/server";
 
+const RECOMENDADOR_URL =
+  process.env.RECOMENDADOR_URL || "https://backend-api-production-5020.up.railway.app";
+
 export async function POST(req: NextRequest) {
   let { messages } = await req.json();
 
@@ -26,8 +29,8 @@ export async function POST(req: NextRequest) {
   ];
   if (preguntaRecomendacion.some(q => userMsg.includes(q.replace(/[¿?]/g, "")))) {
     try {
-      // Usar la API externa de Railway para obtener recomendaciones actualizadas
-      const response = await fetch("https://backend-api-production-5020.up.railway.app/recomendar?capital=1000&riesgo=moderado&plazo=30d");
+      // Usar el servicio de recomendaciones (local o Railway) para obtener recomendaciones actualizadas
+      const response = await fetch(`${RECOMENDADOR_URL}/recomendar?capital=1000&riesgo=moderado&plazo=30d`);
       const data = await response.json();
       
       if (data.recomendaciones && Array.isArray(data.recomendaciones) && data.recomendaciones.length > 0) {
@@ -1,5 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server';
 
+// Servicio de recomendaciones: local (python scripts/servidor.py) o el backend en Railway
+const RECOMENDADOR_URL =
+  process.env.RECOMENDADOR_URL || 'https://backend-api-production-5020.up.railway.app';
+
 export async function GET(req: NextRequest) {
   const { searchParams } = new URL(req.url);
   const capital = searchParams.get('capital');
@@ -11,7 +15,8 @@ export async function GET(req: NextRequest) {
   }
 
   try {
-    const apiUrl = `https://backend-api-production-5020.up.railway.app/recomendar?capital=${capital}&riesgo=${riesgo}&plazo=${plazo}`;
+    const params = new URLSearchParams({ capital, riesgo, plazo });
+    const apiUrl = `${RECOMENDADOR_URL}/recomendar?${params}`;
     const response = await fetch(apiUrl);
     const data = await response.json();
 
@@ -5,16 +5,28 @@ export async function GET(request: Request): Promise<Response> {
   const url = new URL(request.url);
   const script = url.searchParams.get('script');
   const page = url.searchParams.get('page');
+  const hasta = url.searchParams.get('hasta');
 
-  if (!script || !['extractor', 'modelo_general'].includes(script)) {
+  if (!script || !['extractor', 'modelo_general', 'programador'].includes(script)) {
     return jsonResponse({ error: 'Script inválido' }, 400);
   }
 
   const scriptPath = path.resolve('scripts', `${script}.py`);
   const args: string[] = [scriptPath];
 
+  // Un ciclo completo publicado como version nueva; si ya hay uno en curso se agrupa con el
+  if (script === 'programador') {
+    args.push('--una-vez');
+  }
+
   if (script === 'extractor' && page) {
     args.push(page);
+    // Rango de paginas en un solo proceso: hasta=<n> o hasta=vacia
+    if (hasta === 'vacia') {
+      args.push('--hasta-vacia');
+    } else if (hasta) {
+      args.push('--hasta', hasta);
+    }
   }
 
   try {
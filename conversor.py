@@ -1,4 +1,16 @@
 # script_una_vez.py
-import pandas as pd
-df = pd.read_excel("data/predicciones_liviano.xlsx")
-df.to_json("public/data/criptos_predichas.json", orient="records", indent=2)
+# Regenera public/data/criptos_predichas.json (y sus fragmentos por perfil)
+# desde las criptos ya puntuadas, sin pasar por el Excel.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from cryptored.exportacion import exportar_perfiles, exportar_predicciones  # noqa: E402
+from cryptored.modelado import OUTPUT_JSON, cargar_puntuadas  # noqa: E402
+
+df = cargar_puntuadas()
+recomendadas = df[df["predicted"] == True]
+tamano = exportar_predicciones(recomendadas, OUTPUT_JSON)
+exportar_perfiles(recomendadas)
+print(f"JSON generado: {OUTPUT_JSON} ({len(recomendadas)} criptos, {tamano / 1024:.1f} KB)")
@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.almacen import escribir_atomico  # noqa: E402
+from cryptored.backtest import (  # noqa: E402
+    HORIZONTE_DIAS, RIESGOS, TOP_N, VENTANA_ENTRENAMIENTO, ejecutar_backtest
+)
+from cryptored.modelado import BACKEND_DEFECTO, BACKENDS  # noqa: E402
+from cryptored.riesgo import filtro_riesgo  # noqa: E402
+from cryptored.series import AlmacenSeries  # noqa: E402
+
+# Backtest walk-forward del recomendador sobre data/series: entrena con el
+# pasado, puntua el futuro y simula los portafolios de cada riesgo.
+#   python scripts/backtest.py [--horizonte 30] [--backend gradiente] [--procesos 4]
+
+SALIDA = "data/backtest.json"
+
+
+def guardar_json(ruta: str, datos: dict):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+
+
+def imprimir_resumen(resultado: dict):
+    resumen = resultado["resumen"]
+    print(f"\nFolds: {len(resultado['folds'])} (omitidos: {resumen['omitidos']}), "
+          f"horizonte {resultado['horizonte_dias']} dias, backend {resultado['backend']}")
+    print(f"{'perfil':<10}{'total':>10}{'anual':>10}{'medio':>9}{'ganadores':>11}{'aciertos':>10}{'max DD':>9}")
+    for nombre in RIESGOS + ("mercado",):
+        m = resumen.get(nombre)
+        if not m or not m.get("folds"):
+            continue
+        aciertos = f"{m['tasa_aciertos']:.1%}" if m.get("tasa_aciertos") is not None else "-"
+        print(
+            f"{nombre:<10}{m['retorno_total']:>10.1%}{m['retorno_anualizado']:>10.1%}"
+            f"{m['retorno_medio']:>9.2%}{m['folds_ganadores']:>11.1%}{aciertos:>10}{m['max_drawdown']:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest walk-forward del modelo de recomendacion")
+    parser.add_argument("--series", default=None, help="Directorio de las series (por defecto data/series)")
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE_DIAS, help="Dias entre rebalanceos")
+    parser.add_argument("--ventana", type=int, default=VENTANA_ENTRENAMIENTO, help="Dias de historia para entrenar")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_DEFECTO)
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos para los folds (por defecto todos)")
+    parser.add_argument("--salida", default=SALIDA)
+    args = parser.parse_args()
+
+    try:
+        almacen = AlmacenSeries(args.series) if args.series else AlmacenSeries()
+        inicio = time.perf_counter()
+        resultado = ejecutar_backtest(
+            filtro_riesgo, almacen, args.horizonte, args.backend, args.ventana, args.top_n, args.procesos
+        )
+        resultado["segundos"] = round(time.perf_counter() - inicio, 2)
+        escribir_atomico(args.salida, lambda tmp: guardar_json(tmp, resultado))
+        imprimir_resumen(resultado)
+        print(f"\n[OK] Backtest guardado en: {args.salida} ({resultado['segundos']}s)")
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.modelado import ARBOLES_INCREMENTO, crear_modelo, ampliar_modelo  # noqa: E402
+
+# Compara tiempo de entrenamiento y AUC de los backends a medida que crece el
+# dataset. Los datos son sinteticos, con las mismas columnas que el modelo real;
+# la etiqueta se calcula sobre variaciones con ruido para que el AUC no sea 1.
+#   python scripts/bench_entrenamiento.py --tamanos 1000 10000 50000
+
+FEATURES = [
+    "market_cap", "current_price", "price_change_24h", "price_change_7d", "price_change_30d",
+    "volume_24h", "market_cap_rank", "btc_change_7d", "btc_change_30d"
+]
+FRACCION_NUEVA = 0.1
+
+
+def datos_sinteticos(n: int, semilla: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "market_cap": 10 ** rng.uniform(6, 12, n),
+        "current_price": 10 ** rng.uniform(-4, 4, n),
+        "price_change_24h": rng.normal(0, 5, n),
+        "price_change_7d": rng.normal(1, 12, n),
+        "price_change_30d": rng.normal(5, 35, n),
+        "volume_24h": 10 ** rng.uniform(4, 10, n),
+        "market_cap_rank": rng.integers(1, max(n, 2), n).astype(float),
+        "btc_change_7d": rng.normal(0, 4, n),
+        "btc_change_30d": rng.normal(0, 10, n),
+    })
+    ruido_30d = df["price_change_30d"] + rng.normal(0, 15, n)
+    ruido_7d = df["price_change_7d"] + rng.normal(0, 6, n)
+    df["target"] = (ruido_30d > 15) & (ruido_7d > 0)
+    return df
+
+
+def medir(modelo, X_train, y_train, X_test, y_test) -> tuple[float, float]:
+    from sklearn.metrics import roc_auc_score
+
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    segundos = time.perf_counter() - inicio
+    return segundos, roc_auc_score(y_test, modelo.predict_proba(X_test)[:, 1])
+
+
+def comparar(n: int) -> list:
+    from sklearn.model_selection import train_test_split
+
+    df = datos_sinteticos(n)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURES], df["target"], test_size=0.3, random_state=42, stratify=df["target"]
+    )
+    resultados = []
+
+    def agregar(backend, segundos, auc, **extra):
+        resultados.append({
+            "filas": n, "backend": backend,
+            "fit_s": round(segundos, 3), "auc": round(auc, 4), **extra
+        })
+
+    agregar("bosque_1_hilo", *medir(crear_modelo("bosque", n_jobs=1), X_train, y_train, X_test, y_test))
+    agregar("bosque", *medir(crear_modelo("bosque"), X_train, y_train, X_test, y_test), nucleos=os.cpu_count())
+    agregar("gradiente", *medir(crear_modelo("gradiente"), X_train, y_train, X_test, y_test))
+
+    # Incremental: modelo entrenado con el 90% de las filas que recibe el resto
+    corte = int(len(X_train) * (1 - FRACCION_NUEVA))
+    for backend in ("bosque", "gradiente"):
+        modelo = crear_modelo(backend)
+        modelo.fit(X_train.iloc[:corte], y_train.iloc[:corte])
+        if not ampliar_modelo(modelo, FEATURES, backend, y_train):
+            continue
+        agregar(
+            f"{backend}_incremental", *medir(modelo, X_train, y_train, X_test, y_test),
+            arboles_nuevos=ARBOLES_INCREMENTO
+        )
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de backends de entrenamiento")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    todos = []
+    for n in args.tamanos:
+        for resultado in comparar(n):
+            print(json.dumps(resultado), flush=True)
+            todos.append(resultado)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(todos, f, indent=2)
+        print(f"[OK] Resultados guardados en: {args.salida}")
@@ -0,0 +1,43 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.descarga import ClienteCoinGecko
+from cryptored.stub_coingecko import iniciar_stub
+
+# Mide paginas/minuto del extractor contra un stub local de CoinGecko.
+# Uso: python scripts/bench_extractor.py [paginas] [latencia_seg] [hilos]
+
+
+def medir(extractor, url: str, paginas: int, hilos: int) -> float:
+    # Cada corrida parte de cero: sin datos, series ni graficos previos
+    for directorio in ("data", "public"):
+        shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(extractor.CHARTS_DIR, exist_ok=True)
+    inicio = time.perf_counter()
+    with ClienteCoinGecko(base_url=url, llamadas_por_minuto=0, hilos=hilos, cache=None) as cliente:
+        extractor.extraer_paginas(1, paginas, cliente)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    paginas = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    latencia = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    hilos = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    server, url = iniciar_stub(latencia=latencia, total_monedas=paginas * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import extractor
+
+        resultados = {}
+        for n in (1, hilos):
+            segundos = medir(extractor, url, paginas, n)
+            resultados[n] = paginas / segundos * 60
+            print(f"[BENCH] hilos={n:<3} {segundos:7.2f}s  {resultados[n]:8.1f} paginas/min")
+        print(f"[BENCH] Aceleracion: x{resultados[hilos] / resultados[1]:.1f}")
+    server.shutdown()
@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.stub_coingecko import iniciar_stub  # noqa: E402
+
+# Benchmark de punta a punta sobre universos sinteticos (por defecto 1k, 10k y
+# 100k criptos con su historial diario): carga, features, entrenamiento,
+# puntuacion, razones, exportacion JSON y portafolio, mas el extractor contra
+# el stub local de CoinGecko. Cada tamano corre en un directorio temporal; los
+# resultados van a un JSON para comparar versiones con --comparar.
+#   python scripts/bench_pipeline.py --tamanos 1000 10000 --salida bench.json
+#   python scripts/bench_pipeline.py --comparar bench_anterior.json
+
+DIAS = 120
+SEMILLA = 42
+PAGINAS_EXTRACTOR = 10
+ESCENARIOS = [
+    {"capital": capital, "riesgo": riesgo, "plazo": plazo, "top_n": 5}
+    for capital in (100, 1000, 25000)
+    for riesgo in ("leve", "moderado", "volatil")
+    for plazo in ("24h", "30d", "1a")
+]
+
+# El stub tiene que estar activo antes de importar descarga (lee la URL al importarse)
+SERVIDOR, URL_STUB = iniciar_stub(latencia=0.0, total_monedas=PAGINAS_EXTRACTOR * 50)
+os.environ.update({"COINGECKO_API_URL": URL_STUB, "COINGECKO_RPM": "0", "COINGECKO_CACHE": "0"})
+
+
+def universo_sintetico(n: int, dias: int = DIAS, semilla: int = SEMILLA) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Precios con un factor de mercado comun (bitcoin es la primera cripto, beta 1)
+    # y ruido propio; las variaciones del registro salen de la misma serie
+    from cryptored.series import dia_actual
+
+    rng = np.random.default_rng(semilla)
+    ids = np.array(["bitcoin"] + [f"coin-{i}" for i in range(1, n)])
+    mercado = rng.normal(0, 0.03, dias)
+    beta = rng.uniform(0.3, 2.0, n)
+    ruido = rng.uniform(0.01, 0.08, n)
+    beta[0], ruido[0] = 1.0, 0.0
+    retornos = beta[:, None] * mercado + ruido[:, None] * rng.standard_normal((n, dias))
+    precios = (10 ** rng.uniform(-4, 4.5, n))[:, None] * np.exp(np.cumsum(retornos, axis=1))
+    market_cap = precios * (10 ** rng.uniform(6, 11, n))[:, None]
+    volumen = market_cap * rng.uniform(0.01, 0.3, n)[:, None] * np.exp(rng.normal(0, 0.3, (n, dias)))
+
+    hoy = dia_actual()
+    series = pd.DataFrame({
+        "coin_id": np.repeat(ids, dias),
+        "dia": np.tile(np.arange(hoy - dias + 1, hoy + 1, dtype=np.int32), n),
+        "price": precios.ravel().astype(np.float32),
+        "volume": volumen.ravel().astype(np.float32),
+        "market_cap": market_cap.ravel().astype(np.float32),
+    })
+
+    def cambio(dias_atras: int) -> np.ndarray:
+        return (precios[:, -1] / precios[:, -1 - dias_atras] - 1) * 100
+
+    registros = pd.DataFrame({
+        "id": ids,
+        "name": [f"Coin {i}" for i in range(n)],
+        "symbol": [f"c{i}" for i in range(n)],
+        "image": "",
+        "chart": "",
+        "market_cap": market_cap[:, -1],
+        "current_price": precios[:, -1],
+        "price_change_24h": cambio(1),
+        "price_change_7d": cambio(7),
+        "price_change_30d": cambio(30),
+        # El historial sintetico no llega a un año: la variacion anual es ruido propio
+        "price_change_1y": rng.normal(20, 80, n),
+        "volume_24h": volumen[:, -1],
+        "market_cap_rank": (-market_cap[:, -1]).argsort().argsort() + 1.0,
+        "predicted": False,
+        "reason": "",
+    })
+    return registros, series
+
+
+def medir_fase(fase: str, funcion, resultados: list, tamano: int):
+    # Corre la fase bajo la instrumentacion y agrega una fila por tramo mas el total
+    from cryptored.instrumentacion import ejecucion, rss_max_mb
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ejecucion(f"bench {fase}", ruta=os.devnull) as registro:
+        valor = funcion()
+    total = time.perf_counter() - inicio
+    tramos = registro.tramos if registro is not None else {}
+    for nombre, t in tramos.items():
+        resultados.append({"tamano": tamano, "etapa": f"{fase}.{nombre}", "segundos": round(t["segundos"], 4)})
+    resultados.append({
+        "tamano": tamano, "etapa": fase, "segundos": round(total, 4),
+        "rss_max_mb": rss_max_mb(),
+        "http_llamadas": registro.http_llamadas if registro is not None else None,
+    })
+    return valor
+
+
+def bench_tamano(n: int, backend: str, dias: int) -> list:
+    from cryptored.almacen import AlmacenCriptos
+    from cryptored.modelado import entrenar_y_publicar, puntuar_y_publicar
+    from cryptored.recomendacion import OUTPUT_JSON
+    from cryptored.series import AlmacenSeries
+    from modelo_portafolio import calcular_escenarios, cargar_criptos
+
+    resultados = []
+    inicio = time.perf_counter()
+    registros, series = universo_sintetico(n, dias)
+    AlmacenCriptos(json_origen=None).escribir_cambios(registros)
+    AlmacenSeries().agregar(series)
+    del series
+    resultados.append({"tamano": n, "etapa": "generar", "segundos": round(time.perf_counter() - inicio, 4)})
+
+    medir_fase("train", lambda: entrenar_y_publicar(backend=backend), resultados, n)
+    medir_fase("score", puntuar_y_publicar, resultados, n)
+    medir_fase("portafolio", lambda: calcular_escenarios(cargar_criptos(OUTPUT_JSON), ESCENARIOS), resultados, n)
+    return resultados
+
+
+def bench_extractor(paginas: int) -> list:
+    import extractor
+    from cryptored.descarga import ClienteCoinGecko
+
+    def extraer():
+        with ClienteCoinGecko(hilos=8, cache=None) as cliente:
+            extractor.extraer_paginas(1, paginas, cliente)
+
+    SERVIDOR.total_monedas = paginas * 50
+    resultados = []
+    medir_fase("extractor", extraer, resultados, paginas * 50)
+    return resultados
+
+
+def metadatos(backend: str, dias: int) -> dict:
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "backend": backend,
+        "dias": dias,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "plataforma": platform.platform(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+def comparar(actual: list, ruta_anterior: str):
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anterior = {(r["tamano"], r["etapa"]): r["segundos"] for r in json.load(f)["resultados"]}
+    print(f"{'tamano':>8} {'etapa':<24} {'antes':>9} {'ahora':>9} {'cambio':>8}")
+    for r in actual:
+        previo = anterior.get((r["tamano"], r["etapa"]))
+        if previo:
+            print(f"{r['tamano']:>8} {r['etapa']:<24} {previo:>9.3f} {r['segundos']:>9.3f} {r['segundos'] / previo:>7.2f}x")
+
+
+if __name__ == "__main__":
+    from cryptored.modelado import BACKEND_DEFECTO, BACKENDS
+
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline completo con datos sinteticos")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dias", type=int, default=DIAS, help="Dias de historial por cripto")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_DEFECTO)
+    parser.add_argument(
+        "--paginas-extractor", type=int, default=PAGINAS_EXTRACTOR,
+        help="Paginas de 50 a extraer del stub (0 omite el extractor)"
+    )
+    parser.add_argument("--salida", default="data/bench_pipeline.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="Resultados anteriores (JSON de --salida) contra los que comparar")
+    args = parser.parse_args()
+    salida = os.path.abspath(args.salida)
+    anterior = os.path.abspath(args.comparar) if args.comparar else None
+    origen = os.getcwd()
+
+    todos = []
+    try:
+        for n in args.tamanos:
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                for r in bench_tamano(n, args.backend, args.dias):
+                    print(json.dumps(r), flush=True)
+                    todos.append(r)
+                os.chdir(origen)
+        if args.paginas_extractor > 0:
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                for r in bench_extractor(args.paginas_extractor):
+                    print(json.dumps(r), flush=True)
+                    todos.append(r)
+                os.chdir(origen)
+    finally:
+        os.chdir(origen)
+        SERVIDOR.shutdown()
+
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({"meta": metadatos(args.backend, args.dias), "resultados": todos}, f, indent=2)
+    print(f"[OK] Resultados guardados en: {salida}")
+    if anterior:
+        comparar(todos, anterior)
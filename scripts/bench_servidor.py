@@ -0,0 +1,115 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+# Prueba de carga del servicio de recomendaciones: reporta p50/p99 y peticiones/s.
+# Sin --url levanta scripts/servidor.py en un proceso aparte. Las latencias son
+# solo de respuestas 200; los errores se cuentan aparte y hacen fallar la corrida.
+
+RIESGOS = ["leve", "moderado", "volatil"]
+PLAZOS = ["24h", "30d", "1a"]
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(host: str, puerto: int, timeout: float = 30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            conn = http.client.HTTPConnection(host, puerto, timeout=1)
+            conn.request("GET", "/salud")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError("El servidor no respondio a tiempo")
+
+
+def cliente(host: str, puerto: int, n: int, latencias: list, errores: list, semilla: int):
+    rnd = random.Random(semilla)
+    conn = http.client.HTTPConnection(host, puerto, timeout=10)
+    for _ in range(n):
+        capital = rnd.choice([100, 500, 1000, 2500, 10000])
+        ruta = f"/recomendar?capital={capital}&riesgo={rnd.choice(RIESGOS)}&plazo={rnd.choice(PLAZOS)}"
+        inicio = time.perf_counter()
+        try:
+            conn.request("GET", ruta)
+            r = conn.getresponse()
+            r.read()
+            if r.status != 200:
+                # Un 4xx/5xx rapido no cuenta como latencia: bajaria p50/p99
+                errores.append(r.status)
+                continue
+        except OSError as e:
+            errores.append(str(e))
+            conn = http.client.HTTPConnection(host, puerto, timeout=10)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del recomendador")
+    parser.add_argument("--url", help="URL de un servidor ya levantado")
+    parser.add_argument("--datos", default="public/data/criptos_predichas.json")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    proceso = None
+    if args.url:
+        destino = urlparse(args.url)
+        host, puerto = destino.hostname, destino.port or 80
+    else:
+        host, puerto = "127.0.0.1", puerto_libre()
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor.py")
+        proceso = subprocess.Popen(
+            [sys.executable, script, "--puerto", str(puerto), "--datos", args.datos],
+            stdout=subprocess.DEVNULL
+        )
+    try:
+        esperar_servidor(host, puerto)
+        latencias, errores = [], []
+        por_hilo = args.peticiones // args.concurrencia
+        hilos = [
+            threading.Thread(target=cliente, args=(host, puerto, por_hilo, latencias, errores, i))
+            for i in range(args.concurrencia)
+        ]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        total = time.perf_counter() - inicio
+
+        cuantiles = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else [0] * 99
+        resultado = {
+            "peticiones": len(latencias),
+            "errores": len(errores),
+            "errores_por_tipo": {str(k): v for k, v in Counter(errores).most_common()},
+            "concurrencia": args.concurrencia,
+            "p50_ms": round(cuantiles[49] * 1000, 2),
+            "p99_ms": round(cuantiles[98] * 1000, 2),
+            "rps": round(len(latencias) / total, 1),
+        }
+        print(json.dumps(resultado))
+        if errores:
+            print(f"[ERROR] {len(errores)} peticiones fallidas", file=sys.stderr)
+            sys.exit(1)
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
@@ -0,0 +1 @@
+# Utilidades compartidas por los scripts de extraccion, modelado y portafolio.
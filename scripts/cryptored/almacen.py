@@ -0,0 +1,136 @@
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Almacen columnar de criptos: un base.parquet compactado mas deltas append-only
+# con solo las filas cambiadas. El JSON de public/data es una vista exportada.
+
+DIRECTORIO = "data/criptos"
+JSON_FRONTEND = "public/data/criptos_completas.json"
+MAX_DELTAS = 24
+
+
+def escribir_atomico(ruta: str, escribir):
+    # Escribe en un temporal del mismo directorio y lo renombra: los lectores
+    # ven el archivo anterior o el nuevo completo, nunca uno a medias
+    directorio = os.path.dirname(ruta) or "."
+    os.makedirs(directorio, exist_ok=True)
+    tmp = os.path.join(directorio, f".{os.path.basename(ruta)}.{os.getpid()}.tmp")
+    try:
+        escribir(tmp)
+        os.replace(tmp, ruta)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def exportar_json(registros: list, ruta: str = JSON_FRONTEND):
+    def escribir(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(registros, f, ensure_ascii=False, separators=(",", ":"))
+    escribir_atomico(ruta, escribir)
+
+
+class AlmacenCriptos:
+    def __init__(self, directorio: str = DIRECTORIO, clave: str = "symbol", json_origen: str | None = JSON_FRONTEND):
+        self.directorio = directorio
+        self.clave = clave
+        self.json_origen = json_origen
+        self.ruta_base = os.path.join(directorio, "base.parquet")
+
+    # === ARCHIVOS ===
+    def deltas(self) -> list:
+        return sorted(glob.glob(os.path.join(self.directorio, "delta-*.parquet")))
+
+    def archivos(self) -> list:
+        base = [self.ruta_base] if os.path.exists(self.ruta_base) else []
+        return base + self.deltas()
+
+    def version(self) -> str:
+        # Cambia con cada escritura; sirve para invalidar caches derivados
+        h = hashlib.sha1()
+        for ruta in self.archivos():
+            st = os.stat(ruta)
+            h.update(f"{os.path.basename(ruta)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()[:16]
+
+    def columnas(self) -> list:
+        vistas = []
+        for ruta in self._archivos_o_migrar():
+            for nombre in pq.read_schema(ruta).names:
+                if nombre not in vistas:
+                    vistas.append(nombre)
+        return vistas
+
+    def _archivos_o_migrar(self) -> list:
+        archivos = self.archivos()
+        if not archivos and self.json_origen and os.path.exists(self.json_origen):
+            with open(self.json_origen, encoding="utf-8") as f:
+                registros = json.load(f)
+            if registros:
+                self._escribir_tabla(self.ruta_base, pd.DataFrame(registros))
+                print(f"[INFO] Almacen inicializado desde {self.json_origen} ({len(registros)} filas)")
+            archivos = self.archivos()
+        return archivos
+
+    # === LECTURA ===
+    def leer(self, columnas: list | None = None) -> pd.DataFrame:
+        partes = []
+        for ruta in self._archivos_o_migrar():
+            cols = None
+            if columnas is not None:
+                disponibles = set(pq.read_schema(ruta).names)
+                cols = [c for c in dict.fromkeys([self.clave] + list(columnas)) if c in disponibles]
+            partes.append(pq.read_table(ruta, columns=cols, memory_map=True).to_pandas())
+
+        if not partes:
+            return pd.DataFrame(columns=columnas or [])
+
+        df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        if len(partes) > 1:
+            # Gana la ultima version de cada clave; el orden es el de primera aparicion
+            # Cada delta trae filas completas que reemplazan a las anteriores
+            orden = df[self.clave].drop_duplicates(keep="first")
+            columnas_df = df.columns
+            df = df.drop_duplicates(self.clave, keep="last").set_index(self.clave).loc[orden].reset_index()
+            df = df[columnas_df]
+        if columnas is not None:
+            df = df.reindex(columns=[c for c in columnas if c in df.columns])
+        return df
+
+    def leer_registros(self) -> list:
+        df = self.leer()
+        return json.loads(df.to_json(orient="records", force_ascii=False)) if len(df) else []
+
+    # === ESCRITURA ===
+    def _escribir_tabla(self, ruta: str, df: pd.DataFrame):
+        tabla = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        escribir_atomico(ruta, lambda tmp: pq.write_table(tabla, tmp, compression="zstd"))
+
+    def escribir_cambios(self, registros) -> int:
+        df = registros if isinstance(registros, pd.DataFrame) else pd.DataFrame(list(registros))
+        if df.empty:
+            return 0
+        self._archivos_o_migrar()
+        if not os.path.exists(self.ruta_base):
+            self._escribir_tabla(self.ruta_base, df)
+        else:
+            nombre = f"delta-{time.time_ns()}-{os.getpid()}.parquet"
+            self._escribir_tabla(os.path.join(self.directorio, nombre), df)
+            if len(self.deltas()) > MAX_DELTAS:
+                self.compactar()
+        return len(df)
+
+    def compactar(self):
+        deltas = self.deltas()
+        if not deltas:
+            return
+        self._escribir_tabla(self.ruta_base, self.leer())
+        for ruta in deltas:
+            os.remove(ruta)
@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Formato compacto de inferencia para los modelos de arboles. Todos los arboles
+# se aplanan en arreglos NumPy contiguos (un .npy por campo) mas un meta.json;
+# el predictor es NumPy puro, no necesita sklearn ni unpickle y puede abrir los
+# arreglos con mmap. Admite RandomForestClassifier (promedio de probabilidades)
+# y HistGradientBoostingClassifier (suma de hojas + sigmoide).
+
+DIRECTORIO = "data/modelo_arboles"
+FORMATO = 1
+CAMPOS = ("raices", "feature", "umbral", "izquierda", "derecha", "faltante_izquierda", "valor")
+
+
+def _aplanar_bosque(model) -> dict:
+    partes = {c: [] for c in CAMPOS if c != "raices"}
+    raices, desplazamiento = [], 0
+    positiva = list(model.classes_).index(True) if True in list(model.classes_) else 1
+    for estimador in model.estimators_:
+        arbol = estimador.tree_
+        hoja = arbol.children_left == -1
+        valor = arbol.value[:, 0, :]
+        raices.append(desplazamiento)
+        partes["feature"].append(np.where(hoja, -1, arbol.feature))
+        partes["umbral"].append(arbol.threshold)
+        partes["izquierda"].append(np.where(hoja, -1, arbol.children_left + desplazamiento))
+        partes["derecha"].append(np.where(hoja, -1, arbol.children_right + desplazamiento))
+        partes["faltante_izquierda"].append(arbol.missing_go_to_left.astype(bool))
+        partes["valor"].append(valor[:, positiva] / valor.sum(axis=1))
+        desplazamiento += arbol.node_count
+    return {"raices": np.asarray(raices), **{c: np.concatenate(v) for c, v in partes.items()}}
+
+
+def _aplanar_gradiente(model) -> dict:
+    partes = {c: [] for c in CAMPOS if c != "raices"}
+    raices, desplazamiento = [], 0
+    for (predictor,) in model._predictors:
+        nodos = predictor.nodes
+        if nodos["is_categorical"].any():
+            raise ValueError("Las features categoricas no estan soportadas en el formato compacto")
+        hoja = nodos["is_leaf"].astype(bool)
+        raices.append(desplazamiento)
+        partes["feature"].append(np.where(hoja, -1, nodos["feature_idx"]))
+        partes["umbral"].append(nodos["num_threshold"])
+        partes["izquierda"].append(np.where(hoja, -1, nodos["left"].astype(np.int64) + desplazamiento))
+        partes["derecha"].append(np.where(hoja, -1, nodos["right"].astype(np.int64) + desplazamiento))
+        partes["faltante_izquierda"].append(nodos["missing_go_to_left"].astype(bool))
+        partes["valor"].append(nodos["value"])
+        desplazamiento += len(nodos)
+    return {"raices": np.asarray(raices), **{c: np.concatenate(v) for c, v in partes.items()}}
+
+
+def _preparar(arreglos: dict, float32: bool) -> tuple[dict, int]:
+    # Las hojas apuntan a si mismas (umbral +inf) para que el predictor recorra
+    # todos los arboles un numero fijo de niveles, sin mascaras por nodo
+    hoja = arreglos["feature"] < 0
+    indices = np.arange(len(hoja))
+    izquierda = np.where(hoja, indices, arreglos["izquierda"])
+    derecha = np.where(hoja, indices, arreglos["derecha"])
+    umbral = arreglos["umbral"]
+    if float32:
+        # sklearn compara X en float32 contra umbrales float64: redondear el umbral
+        # hacia abajo a float32 da exactamente las mismas decisiones
+        umbral32 = umbral.astype(np.float32)
+        umbral = np.where(umbral32 > umbral, np.nextafter(umbral32, np.float32(-np.inf)), umbral32)
+
+    profundidad = np.zeros(len(hoja), dtype=np.int64)
+    for nodo in range(len(hoja)):
+        # Los hijos siempre tienen indice mayor que el padre
+        if not hoja[nodo]:
+            profundidad[izquierda[nodo]] = profundidad[derecha[nodo]] = profundidad[nodo] + 1
+
+    preparados = {
+        "raices": arreglos["raices"].astype(np.int32),
+        "feature": np.where(hoja, 0, arreglos["feature"]).astype(np.int32),
+        "umbral": np.where(hoja, np.inf, umbral).astype(np.float32 if float32 else np.float64),
+        "izquierda": izquierda.astype(np.int32),
+        "derecha": derecha.astype(np.int32),
+        "faltante_izquierda": (arreglos["faltante_izquierda"] | hoja).astype(np.bool_),
+        "valor": arreglos["valor"].astype(np.float64),
+    }
+    return preparados, int(profundidad.max())
+
+
+def exportar(model, directorio: str = DIRECTORIO) -> str:
+    tipo = type(model).__name__
+    if tipo == "RandomForestClassifier":
+        arreglos, meta = _aplanar_bosque(model), {"agregacion": "promedio", "base": 0.0, "float32": True}
+    elif tipo == "HistGradientBoostingClassifier":
+        if model.n_trees_per_iteration_ != 1:
+            raise ValueError("Solo se soporta clasificacion binaria")
+        base = float(np.ravel(model._baseline_prediction)[0])
+        arreglos, meta = _aplanar_gradiente(model), {"agregacion": "sigmoide", "base": base, "float32": False}
+    else:
+        raise ValueError(f"Modelo no soportado para exportar: {tipo}")
+
+    arreglos, profundidad = _preparar(arreglos, meta["float32"])
+    meta.update({
+        "formato": FORMATO,
+        "tipo": tipo,
+        "features": [str(f) for f in model.feature_names_in_],
+        "arboles": int(len(arreglos["raices"])),
+        "nodos": int(len(arreglos["feature"])),
+        "profundidad": profundidad,
+    })
+    if getattr(model, "plazos_", None):
+        # Plazos con los que se entreno el modelo apilado (ver cryptored/modelado.py)
+        meta["plazos"] = list(model.plazos_)
+
+    # Se escribe en un directorio temporal y se reemplaza completo
+    tmp = directorio + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for campo in CAMPOS:
+        np.save(os.path.join(tmp, f"{campo}.npy"), np.ascontiguousarray(arreglos[campo]))
+    _escribir_meta(os.path.join(tmp, "meta.json"), meta)
+    viejo = directorio + ".old"
+    shutil.rmtree(viejo, ignore_errors=True)
+    if os.path.islink(directorio):
+        # Enlace a la version publicada (cryptored/versiones.py): se suelta, no se toca la version
+        os.remove(directorio)
+    elif os.path.exists(directorio):
+        os.replace(directorio, viejo)
+    os.replace(tmp, directorio)
+    shutil.rmtree(viejo, ignore_errors=True)
+    return directorio
+
+
+def _escribir_meta(ruta: str, meta: dict):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+class ModeloArboles:
+    # Interfaz minima compatible con sklearn: feature_names_in_, predict_proba y predict
+    def __init__(self, directorio: str = DIRECTORIO, mmap: bool = True):
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("formato") != FORMATO:
+            raise ValueError(f"Formato de modelo no soportado: {self.meta.get('formato')}")
+        modo = "r" if mmap else None
+        for campo in CAMPOS:
+            setattr(self, campo, np.load(os.path.join(directorio, f"{campo}.npy"), mmap_mode=modo))
+        self.feature_names_in_ = np.asarray(self.meta["features"], dtype=object)
+        self.plazos_ = self.meta.get("plazos")
+        self.classes_ = np.array([False, True])
+
+    def _hojas(self, X: np.ndarray, bloque: int = 2048) -> np.ndarray:
+        # Recorre todos los arboles a la vez, nivel por nivel: (muestras x arboles) de hojas
+        hojas = np.empty((len(X), len(self.raices)), dtype=np.int32)
+        for inicio in range(0, len(X), bloque):
+            Xb = X[inicio:inicio + bloque]
+            plano = Xb.ravel()
+            base = (np.arange(len(Xb), dtype=np.int32) * Xb.shape[1])[:, None]
+            nodo = np.repeat(np.asarray(self.raices)[None, :], len(Xb), axis=0)
+            for _ in range(self.meta["profundidad"]):
+                x = plano[self.feature[nodo] + base]
+                izquierda = (x <= self.umbral[nodo]) | (np.isnan(x) & self.faltante_izquierda[nodo])
+                nodo = np.where(izquierda, self.izquierda[nodo], self.derecha[nodo])
+            hojas[inicio:inicio + bloque] = nodo
+        return hojas
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32 if self.meta["float32"] else np.float64)
+        valores = self.valor[self._hojas(X)]
+        if self.meta["agregacion"] == "promedio":
+            p = valores.mean(axis=1)
+        else:
+            p = 1 / (1 + np.exp(-(self.meta["base"] + valores.sum(axis=1))))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_proba(X)[:, 1] >= 0.5
+
+
+def cargar(directorio: str = DIRECTORIO, mmap: bool = True) -> ModeloArboles:
+    return ModeloArboles(directorio, mmap)
@@ -0,0 +1,233 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from cryptored.indicadores import INDICADORES, matrices_indicadores
+from cryptored.modelado import BACKEND_DEFECTO, BASE_FEATURES, BTC_FEATURES, crear_modelo
+from cryptored.riesgo import RIESGOS
+from cryptored.series import AlmacenSeries
+
+# Backtest walk-forward sobre las series diarias guardadas. En cada fecha de
+# rebalanceo se reconstruye la foto del mercado de ese dia (precio, variaciones,
+# volumen, ranking), se entrena solo con fotos cuyo resultado ya se conocia
+# (dia + horizonte <= fecha) y se puntua el mercado de la fecha. Los indicadores
+# de cryptored.indicadores se calculan con ventanas que solo miran hacia atras. Los
+# portafolios por riesgo se mantienen hasta el siguiente rebalanceo.
+
+HORIZONTE_DIAS = 30
+UMBRAL_SUBIDA = 15.0  # % de subida en el horizonte para contar como positivo
+VENTANA_ENTRENAMIENTO = 180
+MUESTREO_DIAS = 7
+MIN_DIAS_ENTRENAMIENTO = 28  # historial de fotos minimo antes del primer rebalanceo
+MIN_POSITIVOS = 5
+TOP_N = 5
+OBLIGATORIAS = BASE_FEATURES + ["volume_24h", "market_cap_rank"] + BTC_FEATURES
+FEATURES = OBLIGATORIAS + INDICADORES
+MONEDA_BTC = "bitcoin"
+
+_datos = None
+
+
+# === FOTOS DIARIAS ===
+def _variacion(P: np.ndarray, k: int) -> np.ndarray:
+    # Variacion porcentual a k dias en cada celda (criptos x dias); NaN sin historial
+    V = np.full(P.shape, np.nan, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        V[:, k:] = (P[:, k:] / P[:, :-k] - 1) * 100
+    return V
+
+
+def variacion_futura(P: np.ndarray, horizonte: int) -> np.ndarray:
+    # Variacion porcentual de cada dia a horizonte dias vista; NaN donde aun no se conoce
+    futuro = np.full(P.shape, np.nan, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        futuro[:, :-horizonte] = (P[:, horizonte:] / P[:, :-horizonte] - 1) * 100
+    return futuro
+
+
+def preparar_datos(almacen: AlmacenSeries | None = None, horizonte: int = HORIZONTE_DIAS) -> dict:
+    # Matrices (criptos x dias) con todas las columnas que necesitan las fotos
+    almacen = almacen or AlmacenSeries()
+    ids, eje_dias, P = almacen.matriz("price")
+    _, _, vol = almacen.matriz("volume", coins=ids)
+    _, _, mc = almacen.matriz("market_cap", coins=ids)
+    P = P.astype(np.float64)
+    mc = mc.astype(np.float64)
+
+    datos = {
+        "ids": ids,
+        "dias": eje_dias,
+        "horizonte": horizonte,
+        "market_cap": mc,
+        "current_price": P,
+        "price_change_24h": _variacion(P, 1),
+        "price_change_7d": _variacion(P, 7),
+        "price_change_30d": _variacion(P, 30),
+        "volume_24h": vol.astype(np.float64),
+        "market_cap_rank": pd.DataFrame(mc).rank(axis=0, ascending=False, method="first").to_numpy(),
+    }
+    # Variacion futura: lo que se quiere predecir y lo que rinde el portafolio
+    datos["futuro"] = variacion_futura(P, horizonte)
+
+    fila_btc = ids.index(MONEDA_BTC) if MONEDA_BTC in ids else None
+    for col, origen in zip(BTC_FEATURES, ("price_change_7d", "price_change_30d")):
+        btc = datos[origen][fila_btc] if fila_btc is not None else np.zeros(len(eje_dias))
+        datos[col] = np.broadcast_to(btc, P.shape)
+    # Mismos indicadores que usa el modelo en produccion; cada dia solo ve su pasado
+    datos.update(matrices_indicadores(ids, P, vol))
+    return datos
+
+
+def foto(datos: dict, t: int, con_futuro: bool = True) -> pd.DataFrame:
+    # Mercado del dia t (indice en el eje de dias) con las columnas del modelo
+    df = pd.DataFrame({col: datos[col][:, t] for col in FEATURES})
+    df.insert(0, "id", datos["ids"])
+    if con_futuro:
+        df["futuro"] = datos["futuro"][:, t]
+    # Los indicadores pueden faltar (NaN) como en produccion; el resto es obligatorio
+    return df[np.isfinite(df[OBLIGATORIAS].to_numpy()).all(axis=1)]
+
+
+# === FOLDS ===
+def dias_minimos(horizonte: int) -> int:
+    # 30 dias para la primera variacion mensual, fotos para entrenar, su horizonte y el del fold
+    return 30 + MIN_DIAS_ENTRENAMIENTO + 2 * horizonte + 1
+
+
+def fechas_rebalanceo(datos: dict) -> list:
+    # Primera fecha con fotos de entrenamiento ya resueltas; despues una por horizonte,
+    # de modo que los periodos de tenencia no se solapan
+    h = datos["horizonte"]
+    inicio = 30 + MIN_DIAS_ENTRENAMIENTO + h
+    return list(range(inicio, len(datos["dias"]) - h, h))
+
+
+def _iniciar_trabajador(datos: dict):
+    global _datos
+    _datos = datos
+
+
+def ejecutar_fold(
+    t: int,
+    filtro,
+    backend: str = BACKEND_DEFECTO,
+    ventana: int = VENTANA_ENTRENAMIENTO,
+    top_n: int = TOP_N,
+    datos: dict | None = None,
+) -> dict:
+    datos = datos if datos is not None else _datos
+    h = datos["horizonte"]
+    fecha = int(datos["dias"][t])
+    resultado = {"dia": fecha, "fecha": str(np.datetime64(fecha, "D"))}
+
+    # Solo fotos cuyo resultado ya era conocido en la fecha del rebalanceo
+    ultimo = t - h
+    dias_train = range(max(30, ultimo - ventana), ultimo + 1, MUESTREO_DIAS)
+    train = pd.concat([foto(datos, d) for d in dias_train], ignore_index=True)
+    train = train[np.isfinite(train["futuro"].to_numpy())]
+    y = train["futuro"] > UMBRAL_SUBIDA
+    if y.sum() < MIN_POSITIVOS or (~y).sum() < MIN_POSITIVOS:
+        return {**resultado, "omitido": "sin suficientes positivos y negativos para entrenar"}
+
+    # Al inicio del historial algunos indicadores aun no existen (p. ej. momentum_60d)
+    usadas = [c for c in FEATURES if train[c].notna().any()]
+    modelo = crear_modelo(backend, n_jobs=1)
+    modelo.fit(train[usadas], y)
+
+    mercado = foto(datos, t)
+    mercado = mercado[np.isfinite(mercado["futuro"].to_numpy())]
+    mercado = mercado.assign(score=modelo.predict_proba(mercado[usadas])[:, 1])
+    retorno = mercado["futuro"].to_numpy() / 100
+    resultado.update({
+        "filas_entrenamiento": len(train),
+        "criptos": len(mercado),
+        "mercado": float(retorno.mean()) if len(retorno) else 0.0,
+    })
+
+    for riesgo in RIESGOS:
+        elegidas = mercado[filtro(mercado, riesgo, "30d")].sort_values("score", ascending=False).head(top_n)
+        if elegidas.empty:
+            resultado[riesgo] = {"retorno": 0.0, "criptos": [], "aciertos": 0}
+            continue
+        pesos = elegidas["score"].to_numpy() / elegidas["score"].sum()
+        retornos = elegidas["futuro"].to_numpy() / 100
+        resultado[riesgo] = {
+            "retorno": float(pesos @ retornos),
+            "criptos": elegidas["id"].tolist(),
+            "aciertos": int((retornos > 0).sum()),
+        }
+    return resultado
+
+
+def ejecutar_backtest(
+    filtro,
+    almacen: AlmacenSeries | None = None,
+    horizonte: int = HORIZONTE_DIAS,
+    backend: str = BACKEND_DEFECTO,
+    ventana: int = VENTANA_ENTRENAMIENTO,
+    top_n: int = TOP_N,
+    procesos: int | None = None,
+) -> dict:
+    # filtro(df, riesgo, plazo) -> mascara booleana de candidatas
+    datos = preparar_datos(almacen, horizonte)
+    fechas = fechas_rebalanceo(datos)
+    if not fechas:
+        raise ValueError(
+            f"Historial insuficiente: hay {len(datos['dias'])} dias guardados y se necesitan "
+            f"al menos {dias_minimos(horizonte)} para un horizonte de {horizonte} dias"
+        )
+
+    procesos = procesos or min(len(fechas), os.cpu_count() or 1)
+    fold = partial(ejecutar_fold, filtro=filtro, backend=backend, ventana=ventana, top_n=top_n)
+    if procesos > 1:
+        # Cada proceso recibe las matrices una sola vez al iniciar
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=(datos,)) as pool:
+            folds = list(pool.map(fold, fechas))
+    else:
+        folds = [fold(t, datos=datos) for t in fechas]
+    return {
+        "horizonte_dias": horizonte,
+        "backend": backend,
+        "top_n": top_n,
+        "folds": folds,
+        "resumen": resumir(folds, horizonte),
+    }
+
+
+# === METRICAS ===
+def metricas(retornos: list, aciertos: int = 0, elegidas: int = 0, periodos_por_anio: float = 1.0) -> dict:
+    r = np.asarray(retornos, dtype=float)
+    if not len(r):
+        return {"folds": 0}
+    curva = np.concatenate([[1.0], np.cumprod(1 + r)])
+    caida = 1 - curva / np.maximum.accumulate(curva)
+    anios = len(r) / periodos_por_anio
+    return {
+        "folds": len(r),
+        "retorno_total": float(curva[-1] - 1),
+        "retorno_anualizado": float(curva[-1] ** (1 / anios) - 1) if curva[-1] > 0 else -1.0,
+        "retorno_medio": float(r.mean()),
+        "folds_ganadores": float((r > 0).mean()),
+        "tasa_aciertos": aciertos / elegidas if elegidas else None,
+        "max_drawdown": float(caida.max()),
+    }
+
+
+def resumir(folds: list, horizonte: int = HORIZONTE_DIAS) -> dict:
+    validos = [f for f in folds if "omitido" not in f]
+    if not validos:
+        return {"omitidos": len(folds)}
+    por_anio = 365 / horizonte
+    resumen = {"omitidos": len(folds) - len(validos)}
+    for riesgo in RIESGOS:
+        resumen[riesgo] = metricas(
+            [f[riesgo]["retorno"] for f in validos],
+            sum(f[riesgo]["aciertos"] for f in validos),
+            sum(len(f[riesgo]["criptos"]) for f in validos),
+            por_anio,
+        )
+    resumen["mercado"] = metricas([f["mercado"] for f in validos], periodos_por_anio=por_anio)
+    return resumen
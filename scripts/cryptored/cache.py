@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Cache en memoria con expulsion LRU y vencimiento por TTL, segura entre hilos.
+
+_FALTA = object()
+
+
+class CacheLRU:
+    def __init__(self, max_entradas: int = 256, ttl: float | None = 300.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.datos = OrderedDict()
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave, defecto=None):
+        with self.lock:
+            entrada = self.datos.get(clave, _FALTA)
+            if entrada is not _FALTA:
+                valor, vence = entrada
+                if vence is None or vence > time.monotonic():
+                    self.datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                del self.datos[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave, valor):
+        vence = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            self.datos[clave] = (valor, vence)
+            self.datos.move_to_end(clave)
+            while len(self.datos) > self.max_entradas:
+                self.datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def obtener_o_calcular(self, clave, calcular):
+        valor = self.obtener(clave, _FALTA)
+        if valor is _FALTA:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, predicado=None):
+        with self.lock:
+            if predicado is None:
+                self.datos.clear()
+            else:
+                for clave in [c for c in self.datos if predicado(c)]:
+                    del self.datos[clave]
+
+    def estadisticas(self) -> dict:
+        with self.lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self.datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+            }
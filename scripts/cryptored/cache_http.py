@@ -0,0 +1,180 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlencode
+
+# Cache HTTP persistente (SQLite) para las llamadas a CoinGecko. Cada respuesta
+# se guarda comprimida con su ETag/Last-Modified y un vencimiento que depende
+# del endpoint. Mientras esta vigente se sirve sin tocar la red; vencida se
+# revalida con una peticion condicional (304 = se reutiliza el cuerpo). El
+# tamano total se acota expulsando las entradas menos usadas.
+#
+# COINGECKO_CACHE: "1" (por defecto), "0" lo desactiva, "offline" sirve solo
+# respuestas grabadas (vigentes o no) y falla si no hay; util para pruebas con
+# una base de fixtures apuntada por COINGECKO_CACHE_RUTA.
+
+RUTA = os.environ.get("COINGECKO_CACHE_RUTA", "data/cache_http.sqlite")
+MODO = os.environ.get("COINGECKO_CACHE", "1").lower()
+MAX_MB = float(os.environ.get("COINGECKO_CACHE_MB", "200"))
+TTL_DEFECTO = 300
+
+# (patron de la ruta, segundos de vigencia); gana el primero que coincide
+TTL_POR_RUTA = [
+    (re.compile(r"^coins/markets$"), 300),            # precios y variaciones: 5 min
+    (re.compile(r"^coins/[^/]+/market_chart$"), 6 * 3600),  # series diarias
+    (re.compile(r"^coins/[^/]+$"), 3600),             # detalle de una moneda (BTC)
+]
+
+
+def ttl_para(ruta: str) -> int:
+    ruta = ruta.strip("/")
+    for patron, ttl in TTL_POR_RUTA:
+        if patron.match(ruta):
+            return ttl
+    return TTL_DEFECTO
+
+
+def clave(url: str, params: dict | None = None) -> str:
+    # Parametros ordenados: la misma consulta siempre da la misma clave
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+class CacheHTTP:
+    def __init__(self, ruta: str = RUTA, max_mb: float = MAX_MB, offline: bool = False):
+        self.ruta = ruta
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.revalidadas = 0
+        self.descargas = 0
+        self.expulsiones = 0
+        if os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False, timeout=30)
+        with self.lock:
+            self.conexion.execute("PRAGMA journal_mode=WAL")
+            self.conexion.execute("PRAGMA synchronous=NORMAL")
+            self.conexion.execute(
+                """CREATE TABLE IF NOT EXISTS respuestas (
+                    clave TEXT PRIMARY KEY,
+                    cuerpo BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expira REAL NOT NULL,
+                    accedido REAL NOT NULL,
+                    bytes INTEGER NOT NULL
+                )"""
+            )
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS idx_accedido ON respuestas (accedido)")
+            self.conexion.commit()
+            self.total_bytes = self.conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM respuestas").fetchone()[0]
+
+    @classmethod
+    def por_defecto(cls) -> "CacheHTTP | None":
+        if MODO in ("0", "no", "false"):
+            return None
+        return cls(offline=MODO == "offline")
+
+    def cerrar(self):
+        with self.lock:
+            self.conexion.close()
+
+    # === LECTURA ===
+    def obtener(self, k: str) -> dict | None:
+        # {"cuerpo", "etag", "last_modified", "vigente"} o None
+        with self.lock:
+            fila = self.conexion.execute(
+                "SELECT cuerpo, etag, last_modified, expira FROM respuestas WHERE clave = ?", (k,)
+            ).fetchone()
+            if fila is None:
+                return None
+            ahora = time.time()
+            self.conexion.execute("UPDATE respuestas SET accedido = ? WHERE clave = ?", (ahora, k))
+            self.conexion.commit()
+        cuerpo, etag, last_modified, expira = fila
+        return {
+            "cuerpo": zlib.decompress(cuerpo),
+            "etag": etag,
+            "last_modified": last_modified,
+            "vigente": expira > ahora,
+        }
+
+    def cabeceras_condicionales(self, entrada: dict | None) -> dict:
+        if entrada is None:
+            return {}
+        cabeceras = {}
+        if entrada["etag"]:
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada["last_modified"]:
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras
+
+    # === ESCRITURA ===
+    def guardar(self, k: str, cuerpo: bytes, ttl: float, etag: str | None = None, last_modified: str | None = None):
+        comprimido = zlib.compress(cuerpo, 3)
+        ahora = time.time()
+        with self.lock:
+            self.descargas += 1
+            anterior = self.conexion.execute("SELECT bytes FROM respuestas WHERE clave = ?", (k,)).fetchone()
+            self.total_bytes += len(comprimido) - (anterior[0] if anterior else 0)
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (k, comprimido, etag, last_modified, ahora + ttl, ahora, len(comprimido)),
+            )
+            self.conexion.commit()
+            self._podar()
+
+    def renovar(self, k: str, ttl: float):
+        # Respuesta 304: el cuerpo guardado sigue valido otro periodo
+        ahora = time.time()
+        with self.lock:
+            self.revalidadas += 1
+            self.conexion.execute(
+                "UPDATE respuestas SET expira = ?, accedido = ? WHERE clave = ?", (ahora + ttl, ahora, k)
+            )
+            self.conexion.commit()
+
+    def acierto(self):
+        with self.lock:
+            self.aciertos += 1
+
+    def _podar(self):
+        # Expulsa las menos usadas hasta quedar en el 90% del limite
+        if self.total_bytes <= self.max_bytes:
+            return
+        objetivo = self.total_bytes - int(self.max_bytes * 0.9)
+        liberado = 0
+        claves = []
+        for k, n in self.conexion.execute("SELECT clave, bytes FROM respuestas ORDER BY accedido"):
+            claves.append((k,))
+            liberado += n
+            if liberado >= objetivo:
+                break
+        self.conexion.executemany("DELETE FROM respuestas WHERE clave = ?", claves)
+        self.conexion.commit()
+        self.total_bytes -= liberado
+        self.expulsiones += len(claves)
+
+    def limpiar(self):
+        with self.lock:
+            self.conexion.execute("DELETE FROM respuestas")
+            self.conexion.commit()
+            self.total_bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self.lock:
+            entradas = self.conexion.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0]
+            return {
+                "entradas": entradas,
+                "bytes": self.total_bytes,
+                "aciertos": self.aciertos,
+                "revalidadas": self.revalidadas,
+                "descargas": self.descargas,
+                "expulsiones": self.expulsiones,
+            }
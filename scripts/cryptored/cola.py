@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import time
+
+# Cola persistente (SQLite) de una extraccion por paginas. Guarda el estado de
+# cada pagina y de cada historial pedido (pendiente, hecha, fallida) con sus
+# intentos. Las marcas se acumulan en memoria y se confirman junto con los
+# datos de la pagina: si el proceso se corta, al volver a correr la misma
+# extraccion se saltan las paginas y monedas ya confirmadas. Una corrida sin
+# actividad hace mas de MAX_HORAS_REANUDAR no se retoma: sus datos ya estan
+# viejos y se empieza de cero.
+
+RUTA = "data/extraccion.sqlite"
+MAX_INTENTOS = 3
+MAX_HORAS_REANUDAR = 6
+
+
+class ColaExtraccion:
+    def __init__(self, ruta: str = RUTA, max_intentos: int = MAX_INTENTOS, max_horas: float = MAX_HORAS_REANUDAR):
+        self.ruta = ruta
+        self.max_intentos = max_intentos
+        self.max_horas = max_horas
+        self.hechas = []
+        self.fallos = {}
+        if os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS corrida (clave TEXT PRIMARY KEY, valor TEXT);
+            CREATE TABLE IF NOT EXISTS paginas (
+                pagina INTEGER PRIMARY KEY,
+                estado TEXT NOT NULL,
+                actualizado REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS monedas (
+                coin_id TEXT PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                pagina INTEGER,
+                estado TEXT NOT NULL,
+                intentos INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                actualizado REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_monedas_estado ON monedas (estado);
+            """
+        )
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    # === CORRIDA ===
+    def _valor(self, clave: str):
+        fila = self.conexion.execute("SELECT valor FROM corrida WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def iniciar(self, parametros: dict, reiniciar: bool = False) -> bool:
+        # True si retoma una corrida reciente sin terminar con los mismos parametros
+        guardados = self._valor("parametros")
+        actividad = float(self._valor("actividad") or 0)
+        if (
+            not reiniciar and guardados and json.loads(guardados) == parametros
+            and self._valor("terminada") is None
+        ):
+            if time.time() - actividad <= self.max_horas * 3600:
+                return True
+            print(f"[INFO] La extraccion anterior lleva mas de {self.max_horas:g} h sin actividad: se empieza de cero")
+        with self.conexion:
+            self.conexion.execute("DELETE FROM corrida")
+            self.conexion.execute("DELETE FROM paginas")
+            self.conexion.execute("DELETE FROM monedas")
+            self.conexion.execute(
+                "INSERT INTO corrida VALUES ('parametros', ?)", (json.dumps(parametros, sort_keys=True),)
+            )
+            self.conexion.execute("INSERT INTO corrida VALUES ('actividad', ?)", (str(time.time()),))
+        return False
+
+    def terminar(self):
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO corrida VALUES ('terminada', ?)", (str(time.time()),))
+
+    # === CONSULTAS ===
+    def pagina_hecha(self, pagina: int) -> bool:
+        fila = self.conexion.execute("SELECT estado FROM paginas WHERE pagina = ?", (pagina,)).fetchone()
+        return fila is not None and fila[0] == "hecha"
+
+    def resueltas(self, coin_ids: list) -> set:
+        # Las que no hay que volver a pedir en esta corrida (hechas o sin mas intentos)
+        resueltas = set()
+        for i in range(0, len(coin_ids), 500):
+            bloque = coin_ids[i:i + 500]
+            filas = self.conexion.execute(
+                f"SELECT coin_id FROM monedas WHERE estado IN ('hecha', 'fallida') "
+                f"AND coin_id IN ({','.join('?' * len(bloque))})",
+                bloque,
+            )
+            resueltas.update(coin_id for (coin_id,) in filas)
+        return resueltas
+
+    def pendientes(self) -> dict:
+        # {coin_id: symbol} que fallaron y todavia tienen intentos
+        filas = self.conexion.execute("SELECT coin_id, symbol FROM monedas WHERE estado = 'pendiente'")
+        return dict(filas.fetchall())
+
+    def estadisticas(self) -> dict:
+        conteo = dict(self.conexion.execute("SELECT estado, COUNT(*) FROM monedas GROUP BY estado").fetchall())
+        paginas = self.conexion.execute("SELECT COUNT(*) FROM paginas WHERE estado = 'hecha'").fetchone()[0]
+        return {"paginas": paginas, **{e: conteo.get(e, 0) for e in ("hecha", "pendiente", "fallida")}}
+
+    # === MARCAS (se escriben en confirmar) ===
+    def marcar_hecha(self, coin_id: str, symbol: str):
+        self.hechas.append((coin_id, symbol))
+
+    def marcar_fallo(self, coin_id: str, symbol: str, error: str):
+        self.fallos[coin_id] = (symbol, error)
+
+    def confirmar(self, pagina: int | None = None):
+        # Una transaccion por lote: monedas hechas, fallos con su intento y la
+        # pagina. "intentos" cuenta solo los intentos fallidos
+        ahora = time.time()
+        with self.conexion:
+            self.conexion.executemany(
+                """INSERT INTO monedas (coin_id, symbol, pagina, estado, intentos, actualizado)
+                   VALUES (?, ?, ?, 'hecha', 0, ?)
+                   ON CONFLICT(coin_id) DO UPDATE SET
+                       estado = 'hecha', error = NULL, actualizado = excluded.actualizado""",
+                [(coin_id, symbol, pagina, ahora) for coin_id, symbol in self.hechas],
+            )
+            self.conexion.executemany(
+                """INSERT INTO monedas (coin_id, symbol, pagina, estado, intentos, error, actualizado)
+                   VALUES (?, ?, ?, CASE WHEN ? <= 1 THEN 'fallida' ELSE 'pendiente' END, 1, ?, ?)
+                   ON CONFLICT(coin_id) DO UPDATE SET
+                       intentos = intentos + 1,
+                       estado = CASE WHEN intentos + 1 >= ? THEN 'fallida' ELSE 'pendiente' END,
+                       error = excluded.error, actualizado = excluded.actualizado""",
+                [
+                    (coin_id, symbol, pagina, self.max_intentos, error, ahora, self.max_intentos)
+                    for coin_id, (symbol, error) in self.fallos.items()
+                ],
+            )
+            if pagina is not None:
+                self.conexion.execute(
+                    "INSERT OR REPLACE INTO paginas VALUES (?, 'hecha', ?)", (pagina, ahora)
+                )
+            self.conexion.execute("INSERT OR REPLACE INTO corrida VALUES ('actividad', ?)", (str(ahora),))
+        self.hechas = []
+        self.fallos = {}
@@ -0,0 +1,190 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cryptored.cache_http import CacheHTTP, clave, ttl_para
+from cryptored.instrumentacion import contar_cache, contar_http
+from cryptored.mercado import HORIZONTES, MONEDA_BASE
+
+# === CONFIGURACION ===
+API_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3").rstrip("/")
+# Plan publico de CoinGecko: ~30 llamadas por minuto. 0 desactiva el limitador.
+LLAMADAS_POR_MINUTO = float(os.environ.get("COINGECKO_RPM", "30"))
+RAFAGA = int(os.environ.get("COINGECKO_RAFAGA", "5"))
+HILOS = int(os.environ.get("COINGECKO_HILOS", "8"))
+TIMEOUT = (5, 20)  # (conexion, lectura) en segundos
+MAX_REINTENTOS = 4
+ESPERA_BASE = 1.0
+ESPERA_MAXIMA = 60.0
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+_CACHE_POR_DEFECTO = object()
+
+
+class ErrorDescarga(Exception):
+    pass
+
+
+# === LIMITADOR TOKEN BUCKET ===
+class LimitadorTokens:
+    def __init__(self, llamadas_por_minuto: float, rafaga: int = RAFAGA):
+        self.tasa = llamadas_por_minuto / 60.0
+        self.capacidad = max(1, rafaga)
+        self.tokens = float(self.capacidad)
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def adquirir(self):
+        if self.tasa <= 0:
+            return
+        while True:
+            with self.lock:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.tasa
+            time.sleep(espera)
+
+    def pausar(self, segundos: float):
+        # Tras un 429 se vacia el cubo para que ningun hilo dispare antes de tiempo
+        with self.lock:
+            self.tokens = min(self.tokens, 0.0) - segundos * self.tasa
+
+
+# === CLIENTE HTTP ===
+class ClienteCoinGecko:
+    def __init__(
+        self,
+        base_url: str = API_URL,
+        llamadas_por_minuto: float = LLAMADAS_POR_MINUTO,
+        hilos: int = HILOS,
+        timeout=TIMEOUT,
+        max_reintentos: int = MAX_REINTENTOS,
+        cache=_CACHE_POR_DEFECTO,
+    ):
+        # cache: CacheHTTP propio, None para desactivarlo o por defecto el de COINGECKO_CACHE
+        self.propio = cache is _CACHE_POR_DEFECTO
+        self.cache = CacheHTTP.por_defecto() if self.propio else cache
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_reintentos = max_reintentos
+        self.limitador = LimitadorTokens(llamadas_por_minuto)
+        self.hilos = max(1, hilos)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.hilos, pool_maxsize=self.hilos)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        self.pool = ThreadPoolExecutor(max_workers=self.hilos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.pool.shutdown(wait=True)
+        self.session.close()
+        if self.propio and self.cache is not None:
+            self.cache.cerrar()
+
+    def _espera(self, intento: int, respuesta=None) -> float:
+        if respuesta is not None:
+            retry_after = respuesta.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), ESPERA_MAXIMA)
+                except ValueError:
+                    pass
+        espera = ESPERA_BASE * (2 ** intento)
+        return min(espera + random.uniform(0, espera / 2), ESPERA_MAXIMA)
+
+    def get_json(self, ruta: str, params: dict | None = None):
+        url = f"{self.base_url}/{ruta.lstrip('/')}"
+        k = clave(url, params)
+        entrada = self.cache.obtener(k) if self.cache is not None else None
+        if entrada is not None and (entrada["vigente"] or self.cache.offline):
+            self.cache.acierto()
+            contar_cache()
+            return json.loads(entrada["cuerpo"])
+        if self.cache is not None and self.cache.offline:
+            raise ErrorDescarga(f"{ruta}: sin respuesta grabada (modo offline)")
+        cabeceras = self.cache.cabeceras_condicionales(entrada) if self.cache is not None else {}
+
+        ultimo_error = None
+        for intento in range(self.max_reintentos + 1):
+            self.limitador.adquirir()
+            try:
+                r = self.session.get(url, params=params, headers=cabeceras, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                ultimo_error = e
+                espera = self._espera(intento)
+            else:
+                contar_http(len(r.content))
+                if r.status_code == 304 and entrada is not None:
+                    self.cache.renovar(k, ttl_para(ruta))
+                    return json.loads(entrada["cuerpo"])
+                if r.status_code not in ESTADOS_REINTENTABLES:
+                    r.raise_for_status()
+                    datos = r.json()
+                    if self.cache is not None:
+                        self.cache.guardar(
+                            k, r.content, ttl_para(ruta), r.headers.get("ETag"), r.headers.get("Last-Modified")
+                        )
+                    return datos
+                ultimo_error = requests.HTTPError(f"HTTP {r.status_code} en {ruta}", response=r)
+                espera = self._espera(intento, r)
+                if r.status_code == 429:
+                    self.limitador.pausar(espera)
+            if intento < self.max_reintentos:
+                time.sleep(espera)
+        raise ErrorDescarga(f"{ruta}: {ultimo_error}")
+
+    def mercados(
+        self, pagina: int, por_pagina: int = 50, vs_currency: str = MONEDA_BASE, ids: list | None = None
+    ) -> list:
+        # Todos los horizontes de variacion en la misma llamada
+        params = {
+            "vs_currency": vs_currency,
+            "order": "market_cap_desc",
+            "per_page": por_pagina,
+            "page": pagina,
+            "sparkline": False,
+            "price_change_percentage": ",".join(HORIZONTES)
+        }
+        if ids:
+            params["ids"] = ",".join(ids)
+        return self.get_json("coins/markets", params)
+
+    def market_chart(self, coin_id: str, days: int = 7, vs_currency: str = "usd") -> dict:
+        params = {"vs_currency": vs_currency, "days": days, "interval": "daily"}
+        return self.get_json(f"coins/{coin_id}/market_chart", params)
+
+    def moneda(self, coin_id: str) -> dict:
+        # Solo market_data: sin tickers ni datos de comunidad la respuesta es mucho menor
+        params = {
+            "localization": "false", "tickers": "false", "community_data": "false",
+            "developer_data": "false", "sparkline": "false"
+        }
+        return self.get_json(f"coins/{coin_id}", params)
+
+    def historial_precios(self, coin_id: str, days: int = 7, vs_currency: str = "usd") -> list:
+        return [p[1] for p in self.market_chart(coin_id, days, vs_currency).get("prices", [])]
+
+    def mapear(self, funcion, elementos):
+        # Ejecuta en el pool y devuelve (elemento, resultado, error) en el orden de entrada
+        futuros = [(e, self.pool.submit(funcion, e)) for e in elementos]
+        for elemento, futuro in futuros:
+            try:
+                yield elemento, futuro.result(), None
+            except Exception as e:
+                yield elemento, None, e
@@ -0,0 +1,129 @@
+import gzip
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from cryptored.almacen import escribir_atomico
+from cryptored.mercado import HORIZONTES, MONEDAS, PLAZOS, columna, columna_cambio
+from cryptored.riesgo import RIESGOS, filtro_riesgo
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Exportacion de las criptos puntuadas para el frontend, directo desde el frame:
+# JSON minificado con la precision recortada por columna, codificado con orjson
+# si esta instalado, con copias .gz (y .br si hay brotli) para servir
+# precomprimido, y fragmentos paginados por perfil de riesgo.
+
+DIRECTORIO_PERFILES = "public/data/predichas"
+TAM_PAGINA = 100
+# columna -> decimales; "sig" indica cifras significativas (precios de cualquier escala)
+PRECISION = {
+    "score": 4,
+    **{f"score_{p}": 4 for p in PLAZOS},
+    **{columna_cambio(h, m): 2 for m in MONEDAS for h in HORIZONTES},
+    **{columna("market_cap", m): 0 for m in MONEDAS},
+    **{columna("current_price", m): ("sig", 8) for m in MONEDAS},
+}
+COMPRESIONES = ("gzip", "brotli")
+
+
+def _cifras_significativas(valores: np.ndarray, cifras: int) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitud = np.floor(np.log10(np.abs(valores)))
+    decimales = np.where(np.isfinite(magnitud), cifras - 1 - magnitud, 0)
+    escala = 10.0 ** decimales
+    return np.round(valores * escala) / escala
+
+
+def recortar(df: pd.DataFrame, precision: dict = PRECISION) -> pd.DataFrame:
+    df = df.copy()
+    for col, regla in precision.items():
+        if col not in df.columns:
+            continue
+        valores = df[col].to_numpy(dtype=np.float64)
+        if isinstance(regla, tuple):
+            df[col] = _cifras_significativas(valores, regla[1])
+        elif regla == 0 and np.isfinite(valores).all():
+            df[col] = np.round(valores).astype(np.int64)
+        else:
+            df[col] = np.round(valores, regla)
+    return df
+
+
+def codificar(df: pd.DataFrame) -> bytes:
+    # Lista de registros minificada; NaN pasa a null (JSON valido)
+    registros = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    if orjson is not None:
+        return orjson.dumps(registros, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(registros, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def escribir_bytes(ruta: str, datos: bytes, compresiones: tuple = COMPRESIONES):
+    escribir_atomico(ruta, lambda tmp: _escribir_crudo(tmp, datos))
+
+    # Copias precomprimidas para servidores que las sirven tal cual (gzip_static)
+    if "gzip" in compresiones:
+        comprimido = gzip.compress(datos, compresslevel=9, mtime=0)
+        escribir_atomico(ruta + ".gz", lambda tmp: _escribir_crudo(tmp, comprimido))
+    if "brotli" in compresiones and brotli is not None:
+        comprimido = brotli.compress(datos, quality=11)
+        escribir_atomico(ruta + ".br", lambda tmp: _escribir_crudo(tmp, comprimido))
+
+
+def _escribir_crudo(ruta: str, datos: bytes):
+    with open(ruta, "wb") as f:
+        f.write(datos)
+
+
+def exportar_predicciones(df: pd.DataFrame, ruta: str, compresiones: tuple = COMPRESIONES) -> int:
+    datos = codificar(recortar(df))
+    escribir_bytes(ruta, datos, compresiones)
+    return len(datos)
+
+
+def exportar_perfiles(
+    df: pd.DataFrame,
+    directorio: str = DIRECTORIO_PERFILES,
+    tam_pagina: int = TAM_PAGINA,
+    compresiones: tuple = COMPRESIONES,
+) -> dict:
+    # Un fragmento por perfil y pagina ({riesgo}-{n}.json, ordenado por score) mas
+    # indice.json; la estructura completa se reemplaza de una vez
+    df = recortar(df).sort_values("score", ascending=False)
+    tmp = directorio + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    indice = {"tam_pagina": tam_pagina, "perfiles": {}}
+    for riesgo in RIESGOS:
+        # Candidatas del perfil en cualquier plazo (leve es mas amplio a 1 año)
+        mascara = filtro_riesgo(df, riesgo, "30d") | filtro_riesgo(df, riesgo, "1a")
+        candidatas = df[mascara]
+        paginas = max(1, -(-len(candidatas) // tam_pagina))
+        for n in range(paginas):
+            pagina = candidatas.iloc[n * tam_pagina:(n + 1) * tam_pagina]
+            escribir_bytes(os.path.join(tmp, f"{riesgo}-{n + 1}.json"), codificar(pagina), compresiones)
+        indice["perfiles"][riesgo] = {"total": int(len(candidatas)), "paginas": paginas}
+    escribir_bytes(os.path.join(tmp, "indice.json"), json.dumps(indice).encode("utf-8"), ())
+
+    viejo = directorio + ".old"
+    shutil.rmtree(viejo, ignore_errors=True)
+    if os.path.islink(directorio):
+        # Enlace a la version publicada (cryptored/versiones.py): se suelta, no se toca la version
+        os.remove(directorio)
+    elif os.path.exists(directorio):
+        os.replace(directorio, viejo)
+    os.replace(tmp, directorio)
+    shutil.rmtree(viejo, ignore_errors=True)
+    return indice
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cryptored.almacen import escribir_atomico
+
+# Renderizador de mini graficos (sparklines) por lotes. Cada proceso reutiliza
+# una sola figura Agg y solo cambia los datos de la linea; los graficos cuya
+# serie no cambio (mismo hash) no se vuelven a dibujar.
+
+CHARTS_DIR = "public/charts"
+MANIFIESTO = ".hashes.json"
+COLOR = "#7f5af0"
+ANCHO, ALTO = 3, 1.4  # pulgadas, a 100 dpi -> 300x140 px
+TAM_BLOQUE = 25
+
+_lienzo = None
+
+
+def hash_serie(prices, formato: str) -> str:
+    datos = np.asarray(prices, dtype=np.float32).tobytes()
+    return hashlib.sha1(datos + formato.encode()).hexdigest()[:16]
+
+
+def nombre_archivo(symbol: str, formato: str) -> str:
+    return f"{symbol}_chart.{formato}"
+
+
+def svg_path(prices, ancho: float = 300, alto: float = 140, margen: float = 4) -> str:
+    # Polilinea SVG ("M x,y L x,y ...") escalada al recuadro; sirve inline en el JSON
+    y = np.asarray(prices, dtype=np.float64)
+    if len(y) < 2:
+        return ""
+    x = np.linspace(margen, ancho - margen, len(y))
+    rango = np.ptp(y) or 1.0
+    y = alto - margen - (y - y.min()) / rango * (alto - 2 * margen)
+    puntos = " L".join(f"{a:.1f},{b:.1f}" for a, b in zip(x, y))
+    return f"M{puntos}"
+
+
+def _svg(prices) -> str:
+    d = svg_path(prices)
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="300" height="140" viewBox="0 0 300 140">'
+        f'<path d="{d}" fill="none" stroke="{COLOR}" stroke-width="1.5" stroke-linejoin="round"/></svg>'
+    )
+
+
+def _obtener_lienzo():
+    global _lienzo
+    if _lienzo is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(ANCHO, ALTO))
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        (linea,) = ax.plot([], [], color=COLOR, linewidth=1.5)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        fig.patch.set_alpha(0)
+        ax.patch.set_alpha(0)
+        fig.tight_layout()
+        _lienzo = (canvas, ax, linea)
+    return _lienzo
+
+
+def dibujar(prices, ruta: str, formato: str = "png"):
+    if formato == "svg":
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(_svg(prices))
+        return
+    canvas, ax, linea = _obtener_lienzo()
+    linea.set_data(np.arange(len(prices)), prices)
+    ax.relim()
+    ax.autoscale_view()
+    canvas.print_png(ruta)
+
+
+def _renderizar_bloque(directorio: str, formato: str, trabajos: list) -> list:
+    # Devuelve los simbolos que fallaron
+    fallidos = []
+    for symbol, prices in trabajos:
+        try:
+            dibujar(prices, os.path.join(directorio, nombre_archivo(symbol, formato)), formato)
+        except Exception:
+            fallidos.append(symbol)
+    return fallidos
+
+
+class RenderizadorSparklines:
+    def __init__(self, directorio: str = CHARTS_DIR, procesos: int | None = None, formato: str = "png"):
+        self.directorio = directorio
+        self.formato = formato
+        os.makedirs(directorio, exist_ok=True)
+        self.ruta_manifiesto = os.path.join(directorio, MANIFIESTO)
+        try:
+            with open(self.ruta_manifiesto, encoding="utf-8") as f:
+                self.hashes = json.load(f)
+        except (OSError, ValueError):
+            self.hashes = {}
+        if procesos is None:
+            procesos = min(4, os.cpu_count() or 1)
+        self.pool = ProcessPoolExecutor(procesos) if procesos > 1 else None
+        self.pendientes = []
+        self.omitidos = 0
+        self.dibujados = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def url(self, symbol: str) -> str:
+        return f"/charts/{nombre_archivo(symbol, self.formato)}"
+
+    def enviar(self, trabajos: list) -> dict:
+        # trabajos: [(symbol, prices)]. Devuelve {symbol: url} sin esperar al dibujo;
+        # los que fallen se informan en esperar()
+        urls = {}
+        nuevos = []
+        for symbol, prices in trabajos:
+            if len(prices) == 0:
+                continue
+            h = hash_serie(prices, self.formato)
+            ruta = os.path.join(self.directorio, nombre_archivo(symbol, self.formato))
+            urls[symbol] = self.url(symbol)
+            if self.hashes.get(symbol) == h and os.path.exists(ruta):
+                self.omitidos += 1
+                continue
+            self.hashes[symbol] = h
+            nuevos.append((symbol, [float(p) for p in prices]))
+
+        for i in range(0, len(nuevos), TAM_BLOQUE):
+            bloque = nuevos[i:i + TAM_BLOQUE]
+            if self.pool is None:
+                self.pendientes.append(_renderizar_bloque(self.directorio, self.formato, bloque))
+            else:
+                self.pendientes.append(self.pool.submit(_renderizar_bloque, self.directorio, self.formato, bloque))
+            self.dibujados += len(bloque)
+        return urls
+
+    def esperar(self) -> set:
+        fallidos = set()
+        for pendiente in self.pendientes:
+            fallidos.update(pendiente if isinstance(pendiente, list) else pendiente.result())
+        self.pendientes = []
+        for symbol in fallidos:
+            self.hashes.pop(symbol, None)
+        self.dibujados -= len(fallidos)
+        self._guardar_manifiesto()
+        return fallidos
+
+    def _guardar_manifiesto(self):
+        def escribir(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.hashes, f, separators=(",", ":"))
+        escribir_atomico(self.ruta_manifiesto, escribir)
+
+    def cerrar(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
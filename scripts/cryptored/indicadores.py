@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from cryptored.almacen import escribir_atomico
+from cryptored.series import AlmacenSeries
+
+# Indicadores por cripto calculados sobre las series diarias guardadas:
+# volatilidad, momentum, drawdown, z-score de volumen y beta/correlacion con BTC.
+# Todo se calcula con ventanas moviles sobre la matriz (criptos x dias) de una
+# sola pasada; el resultado del ultimo dia se cachea en disco por version de las
+# series, de modo que entrenar y puntuar lo reutilizan.
+
+CACHE = "data/indicadores.parquet"
+MONEDA_BTC = "bitcoin"
+DIAS_INDICADORES = 91  # 90 retornos diarios
+VENTANAS_VOLATILIDAD = (7, 30)
+VENTANAS_MOMENTUM = (14, 60)
+VENTANAS_DRAWDOWN = (30, 90)
+VENTANA_VOLUMEN = 30
+VENTANA_BTC = 30
+
+INDICADORES = (
+    [f"volatilidad_{v}d" for v in VENTANAS_VOLATILIDAD]
+    + [f"momentum_{v}d" for v in VENTANAS_MOMENTUM]
+    + [f"drawdown_{v}d" for v in VENTANAS_DRAWDOWN]
+    + [f"volumen_z_{VENTANA_VOLUMEN}d", f"beta_btc_{VENTANA_BTC}d", f"correlacion_btc_{VENTANA_BTC}d"]
+)
+
+
+def _minimo(ventana: int) -> int:
+    # Se aceptan ventanas con huecos mientras haya al menos la mitad de los datos
+    return max(3, ventana // 2)
+
+
+def matrices_indicadores(ids: list, precios: np.ndarray, volumenes: np.ndarray) -> dict:
+    # {indicador: matriz (criptos x dias)}; cada columna usa solo dias anteriores o iguales
+    P = pd.DataFrame(precios.T.astype(np.float64))  # dias x criptos para rolling por columna
+    V = pd.DataFrame(volumenes.T.astype(np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_p = np.log(P.where(P > 0))
+    R = log_p.diff()
+
+    resultado = {}
+    for v in VENTANAS_VOLATILIDAD:
+        resultado[f"volatilidad_{v}d"] = R.rolling(v, min_periods=_minimo(v)).std() * 100
+    for v in VENTANAS_MOMENTUM:
+        resultado[f"momentum_{v}d"] = (log_p - log_p.shift(v)) * 100
+    for v in VENTANAS_DRAWDOWN:
+        maximo = P.rolling(v, min_periods=1).max()
+        resultado[f"drawdown_{v}d"] = (P / maximo - 1) * 100
+
+    # z-score del volumen del dia frente a los dias anteriores de la ventana
+    previo = V.shift(1).rolling(VENTANA_VOLUMEN, min_periods=_minimo(VENTANA_VOLUMEN))
+    resultado[f"volumen_z_{VENTANA_VOLUMEN}d"] = (V - previo.mean()) / previo.std().replace(0, np.nan)
+
+    beta = f"beta_btc_{VENTANA_BTC}d"
+    correlacion = f"correlacion_btc_{VENTANA_BTC}d"
+    if MONEDA_BTC in ids:
+        btc = R[ids.index(MONEDA_BTC)]
+        minimo = _minimo(VENTANA_BTC)
+        # Momentos moviles con pares completos: cov = E[xy] - E[x]E[y]
+        conjunto = R.notna() & btc.notna().to_numpy()[:, None]
+        X = R.where(conjunto)
+        Y = pd.DataFrame(np.where(conjunto, btc.to_numpy()[:, None], np.nan))
+        media = lambda M: M.rolling(VENTANA_BTC, min_periods=minimo).mean()  # noqa: E731
+        mx, my = media(X), media(Y)
+        cov = media(X * Y) - mx * my
+        var_x = media(X * X) - mx * mx
+        var_y = media(Y * Y) - my * my
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resultado[beta] = cov / var_y.where(var_y > 0)
+            resultado[correlacion] = cov / np.sqrt((var_x * var_y).where((var_x > 0) & (var_y > 0)))
+    else:
+        resultado[beta] = resultado[correlacion] = pd.DataFrame(np.nan, index=R.index, columns=R.columns)
+
+    return {nombre: m.to_numpy().T for nombre, m in resultado.items()}
+
+
+def calcular_indicadores(almacen: AlmacenSeries | None = None, dias: int = DIAS_INDICADORES) -> pd.DataFrame:
+    # Indicadores del ultimo dia guardado, indexados por coin_id
+    almacen = almacen or AlmacenSeries()
+    ids, _, precios = almacen.matriz("price", dias=dias)
+    _, _, volumenes = almacen.matriz("volume", coins=ids, dias=dias)
+    if not ids or precios.shape[1] == 0:
+        return pd.DataFrame(columns=INDICADORES, index=pd.Index([], name="id"), dtype=np.float64)
+
+    matrices = matrices_indicadores(ids, precios, volumenes)
+    # Una cripto sin dato hoy toma su ultimo valor disponible de cada indicador
+    df = pd.DataFrame(
+        {nombre: pd.DataFrame(m).ffill(axis=1).iloc[:, -1].to_numpy() for nombre, m in matrices.items()},
+        index=pd.Index(ids, name="id"),
+    )
+    return df[INDICADORES].astype(np.float32)
+
+
+def cargar_indicadores(almacen: AlmacenSeries | None = None, ruta: str = CACHE) -> pd.DataFrame:
+    # Reutiliza el cache si corresponde a la version actual de las series
+    almacen = almacen or AlmacenSeries()
+    version = almacen.version()
+    try:
+        with open(ruta + ".json", encoding="utf-8") as f:
+            if json.load(f).get("version") == version:
+                return pd.read_parquet(ruta)
+    except (OSError, ValueError):
+        pass
+
+    df = calcular_indicadores(almacen)
+    escribir_atomico(ruta, lambda tmp: df.to_parquet(tmp))
+    escribir_atomico(ruta + ".json", lambda tmp: _escribir_version(tmp, version))
+    return df
+
+
+def _escribir_version(ruta: str, version: str):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "indicadores": INDICADORES}, f)
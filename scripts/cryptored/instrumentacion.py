@@ -0,0 +1,159 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Instrumentacion comun de los scripts: tramos con tiempo (fetch, history, chart,
+# load, feature, fit, predict, reason, export), llamadas y bytes HTTP, y pico de RSS.
+# Cada ejecucion agrega lineas JSON a METRICAS_RUTA: una por tramo y un resumen
+# al final. Nada se escribe en stdout (modelo_portafolio responde JSON por ahi).
+#
+# METRICAS: "1" (por defecto) o "0" para no escribir nada.
+# METRICAS_MAX_MB: tope del archivo (10 por defecto; 0 sin tope). Al pasarlo, la
+# siguiente ejecucion lo mueve a METRICAS_RUTA.1, pisando el anterior: en disco
+# quedan como mucho dos archivos.
+# METRICAS_PERFIL: ruta de un volcado cProfile (.pstats) de la ejecucion, para
+# pstats/snakeviz; para muestreo sin tocar el codigo, py-spy se engancha al pid
+# que figura en cada linea.
+
+RUTA = os.environ.get("METRICAS_RUTA", "data/metricas.jsonl")
+ACTIVA = os.environ.get("METRICAS", "1").lower() not in ("0", "no", "false")
+PERFIL = os.environ.get("METRICAS_PERFIL") or None
+MAX_MB = float(os.environ.get("METRICAS_MAX_MB", "10"))
+
+_lock = threading.Lock()
+_actual = None
+
+
+def rss_max_mb(hijos: bool = False) -> float | None:
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    if resource is None:
+        return None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN if hijos else resource.RUSAGE_SELF)
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(uso.ru_maxrss / divisor, 1)
+
+
+def rotar(ruta: str, maximo_mb: float = MAX_MB):
+    # Una vez por ejecucion, antes de escribir; os.replace es atomico y un
+    # proceso que ya tenia el archivo abierto termina sus lineas en el rotado
+    if maximo_mb <= 0:
+        return
+    try:
+        if os.path.getsize(ruta) >= maximo_mb * 1024 * 1024:
+            os.replace(ruta, ruta + ".1")
+    except OSError:
+        pass
+
+
+class Ejecucion:
+    def __init__(self, comando: str, ruta: str = RUTA, **atributos):
+        self.id = uuid.uuid4().hex[:12]
+        self.comando = comando
+        self.ruta = ruta
+        self.atributos = atributos
+        self.inicio = time.perf_counter()
+        self.tramos = {}
+        self.http_llamadas = 0
+        self.http_bytes = 0
+        self.http_cache = 0
+
+    def escribir(self, tipo: str, **campos):
+        linea = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "ejecucion": self.id,
+            "pid": os.getpid(),
+            "tipo": tipo,
+            **campos,
+        }
+        texto = json.dumps(linea, ensure_ascii=False, default=str) + "\n"
+        with _lock:
+            if os.path.dirname(self.ruta):
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(texto)
+
+    def registrar_tramo(self, nombre: str, segundos: float, atributos: dict):
+        with _lock:
+            total = self.tramos.setdefault(nombre, {"n": 0, "segundos": 0.0})
+            total["n"] += 1
+            total["segundos"] += segundos
+        self.escribir("tramo", nombre=nombre, segundos=round(segundos, 6), rss_max_mb=rss_max_mb(), **atributos)
+
+    def resumen(self, estado: str) -> dict:
+        return {
+            "comando": self.comando,
+            **self.atributos,
+            "estado": estado,
+            "segundos": round(time.perf_counter() - self.inicio, 6),
+            "http_llamadas": self.http_llamadas,
+            "http_bytes": self.http_bytes,
+            "http_cache": self.http_cache,
+            "rss_max_mb": rss_max_mb(),
+            "rss_max_hijos_mb": rss_max_mb(hijos=True),
+            "tramos": {n: {"n": t["n"], "segundos": round(t["segundos"], 6)} for n, t in self.tramos.items()},
+        }
+
+
+@contextmanager
+def ejecucion(comando: str, ruta: str = RUTA, perfil: str | None = PERFIL, **atributos):
+    # Envuelve un punto de entrada; los tramos y contadores de adentro se le asignan
+    global _actual
+    if not ACTIVA or _actual is not None:
+        yield _actual
+        return
+    rotar(ruta)
+    _actual = Ejecucion(comando, ruta, **atributos)
+    perfilador = cProfile.Profile() if perfil else None
+    if perfilador is not None:
+        perfilador.enable()
+    estado = "error"
+    try:
+        yield _actual
+        estado = "ok"
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(perfil)
+        actual, _actual = _actual, None
+        actual.escribir("resumen", **actual.resumen(estado))
+
+
+@contextmanager
+def tramo(nombre: str, **atributos):
+    # Sin ejecucion activa (uso como libreria) solo cuesta un perf_counter
+    inicio = time.perf_counter()
+    try:
+        yield atributos
+    except BaseException as e:
+        atributos["error"] = type(e).__name__
+        raise
+    finally:
+        actual = _actual
+        if actual is not None:
+            actual.registrar_tramo(nombre, time.perf_counter() - inicio, atributos)
+
+
+def contar_http(n_bytes: int):
+    actual = _actual
+    if actual is not None:
+        with _lock:
+            actual.http_llamadas += 1
+            actual.http_bytes += n_bytes
+
+
+def contar_cache():
+    actual = _actual
+    if actual is not None:
+        with _lock:
+            actual.http_cache += 1
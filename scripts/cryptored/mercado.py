@@ -0,0 +1,65 @@
+import os
+
+# Monedas de cotizacion y horizontes de variacion. /coins/markets devuelve todos
+# los horizontes en la misma llamada, pero una sola moneda por llamada: las
+# paginas se piden en la moneda base y las demas se convierten con la cotizacion
+# de una cripto puente, pedida una vez por corrida en cada moneda. Las columnas
+# de la moneda base no llevan sufijo (current_price, price_change_30d); las de
+# las demas si (current_price_eur, price_change_30d_eur). Sin pandas al importar:
+# lo usan tambien la recomendacion generica y el cliente HTTP.
+
+MONEDA_BASE = "usd"
+MONEDAS = tuple(dict.fromkeys(
+    [MONEDA_BASE] + [m.strip().lower() for m in os.environ.get("COINGECKO_MONEDAS", "usd,eur").split(",") if m.strip()]
+))
+HORIZONTES = ("24h", "7d", "30d", "1y")
+PUENTE = "bitcoin"
+CAMPOS_PRECIO = ("current_price", "market_cap")
+# plazo del portafolio -> horizonte de variacion
+PLAZOS = {"24h": "24h", "30d": "30d", "1a": "1y"}
+# Nombres de /coins/markets -> columnas de la moneda base
+CAMBIOS_API = {f"price_change_percentage_{h}_in_currency": f"price_change_{h}" for h in HORIZONTES}
+
+
+def columna(campo: str, moneda: str = MONEDA_BASE) -> str:
+    return campo if moneda == MONEDA_BASE else f"{campo}_{moneda}"
+
+
+def columna_cambio(horizonte: str, moneda: str = MONEDA_BASE) -> str:
+    return columna(f"price_change_{horizonte}", moneda)
+
+
+def columnas_moneda(moneda: str) -> list:
+    return [columna(c, moneda) for c in CAMPOS_PRECIO] + [columna_cambio(h, moneda) for h in HORIZONTES]
+
+
+def tasas(puente: dict) -> dict:
+    # puente: {moneda: fila de la cripto puente en esa moneda (columnas ya
+    # renombradas)}. Devuelve {moneda: {"precio": factor, horizonte: factor}}:
+    # el precio se multiplica por el factor y (1 + variacion) tambien
+    base = puente[MONEDA_BASE]
+    resultado = {}
+    for moneda, fila in puente.items():
+        if moneda == MONEDA_BASE:
+            continue
+        factores = {"precio": fila["current_price"] / base["current_price"]}
+        for h in HORIZONTES:
+            c = columna_cambio(h)
+            if fila.get(c) is None or base.get(c) is None:
+                factores[h] = float("nan")
+            else:
+                factores[h] = (1 + fila[c] / 100) / (1 + base[c] / 100)
+        resultado[moneda] = factores
+    return resultado
+
+
+def convertir(df, tasas_moneda: dict):
+    # Agrega a un DataFrame las columnas de cada moneda a partir de las de la moneda base
+    df = df.copy()
+    for moneda, factores in tasas_moneda.items():
+        for campo in CAMPOS_PRECIO:
+            df[columna(campo, moneda)] = df[campo] * factores["precio"]
+        for h in HORIZONTES:
+            cambio = df[columna_cambio(h)].astype(float)
+            df[columna_cambio(h, moneda)] = ((1 + cambio / 100) * factores[h] - 1) * 100
+    return df
@@ -0,0 +1,475 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cryptored.almacen import AlmacenCriptos, escribir_atomico
+from cryptored.arboles import ModeloArboles, exportar as exportar_arboles
+from cryptored.exportacion import DIRECTORIO_PERFILES, exportar_perfiles, exportar_predicciones
+from cryptored.indicadores import INDICADORES, cargar_indicadores
+from cryptored.instrumentacion import tramo
+from cryptored.mercado import MONEDAS, PLAZOS, columna_cambio, columnas_moneda
+from cryptored.razones import REGLAS, generar_razones
+from cryptored.series import AlmacenSeries
+from cryptored.versiones import incluir
+from cryptored.recomendacion import OUTPUT_JSON, recomendar_generico_por_plazo  # noqa: F401
+
+# Libreria de modelado: carga, features, entrenamiento, puntuacion y publicacion.
+# No ejecuta nada al importarse; los puntos de entrada estan en modelo_general.py.
+
+INPUT_JSON = "public/data/criptos_completas.json"
+OUTPUT_MODEL = "data/modelo_criptos.pkl"
+# Copia compacta para puntuar sin sklearn (ver cryptored/arboles.py); el pickle
+# se conserva para el entrenamiento incremental
+OUTPUT_ARBOLES = "data/modelo_arboles"
+FEATURES_CACHE = "data/features.parquet"
+PUNTUADAS = "data/puntuadas.parquet"
+UMBRAL_PROBABILIDAD = 0.35
+# Salidas de publicar; con destino (una version de cryptored/versiones.py) se
+# escriben ahi con el mismo nombre y luego se espejan a estas rutas
+PUBLICADOS = [PUNTUADAS, OUTPUT_JSON, OUTPUT_JSON + ".gz", OUTPUT_JSON + ".br", DIRECTORIO_PERFILES]
+# El modelo va en la misma version que los datos que puntuo
+ARTEFACTOS_MODELO = [OUTPUT_MODEL, OUTPUT_ARBOLES]
+
+# Backends de entrenamiento: "bosque" (RandomForest en todos los nucleos) o
+# "gradiente" (HistGradientBoosting). En modo incremental se agregan arboles
+# al modelo guardado en lugar de reentrenar desde cero.
+BACKENDS = ("bosque", "gradiente")
+BACKEND_DEFECTO = os.environ.get("MODELO_BACKEND", "bosque")
+ARBOLES = 150
+ARBOLES_INCREMENTO = 25
+MAX_ARBOLES = 500
+
+BASE_FEATURES = [
+    "market_cap", "current_price",
+    "price_change_24h", "price_change_7d", "price_change_30d"
+]
+OPTIONAL_FEATURES = [
+    "volume_24h", "market_cap_rank",
+    "circulating_supply", "total_supply"
+]
+BTC_FEATURES = ["btc_change_7d", "btc_change_30d"]
+COLUMNAS_ID = ["id", "symbol", "name", "image", "chart"]
+COLUMNAS_SALIDA = [
+    "id", "name", "symbol", "image", "chart", "market_cap", "current_price",
+    "price_change_24h", "price_change_7d", "price_change_30d",
+    "score", "predicted", "reason"
+]
+
+# Un solo modelo para todos los plazos: cada cripto aparece una vez por plazo,
+# con la duracion del plazo como feature extra, y se puntua con un unico predict
+# sobre la matriz apilada. La etiqueta de un plazo es la subida FUTURA en esos
+# dias, como en el backtest: se entrena con fotos del mercado reconstruidas de
+# data/series en dias cuyo resultado ya se conoce, y ningun input (variaciones,
+# indicadores) ve el periodo de la etiqueta. Un plazo sin historial suficiente
+# (1a hasta acumular un año de series) no se entrena ni se puntua.
+# plazo -> (dias, subida minima % en el plazo)
+PLAZOS_MODELO = {
+    "24h": (1, 3),
+    "30d": (30, 15),
+    "1a": (365, 50),
+}
+PLAZO_PRINCIPAL = "30d"  # su score es "score" y decide "predicted"
+FEATURES_PLAZO = ["horizonte_dias"]
+SCORES_PLAZO = [f"score_{p}" for p in PLAZOS_MODELO]
+# Se leen y publican si existen: el cambio a 1 año y las otras monedas
+COLUMNAS_MERCADO = [c for m in MONEDAS for c in columnas_moneda(m) if c not in BASE_FEATURES]
+
+
+def obtener_variacion_btc():
+    from cryptored.descarga import ClienteCoinGecko
+
+    try:
+        with ClienteCoinGecko(hilos=1) as cliente:
+            data = cliente.moneda("bitcoin")["market_data"]
+        return {
+            "btc_change_7d": data["price_change_percentage_7d"],
+            "btc_change_30d": data["price_change_percentage_30d"]
+        }
+    except Exception as e:
+        print(f"[ERROR] No se pudo obtener variacion de BTC: {e}")
+        return {
+            "btc_change_7d": 0.0,
+            "btc_change_30d": 0.0
+        }
+
+
+# === CARGA Y FEATURES ===
+def cargar_datos(almacen: AlmacenCriptos | None = None) -> tuple[pd.DataFrame, list]:
+    almacen = almacen or AlmacenCriptos(json_origen=INPUT_JSON)
+    print("Cargando datos desde:", almacen.directorio)
+    disponibles = almacen.columnas()
+
+    extra = [f for f in OPTIONAL_FEATURES if f in disponibles]
+    features = BASE_FEATURES + extra
+
+    required_cols = COLUMNAS_ID + features
+    missing = [col for col in required_cols if col not in disponibles]
+    if missing:
+        raise ValueError(f"Faltan columnas necesarias: {missing}")
+
+    # Solo se leen las columnas usadas, con lectura mapeada en memoria; las de
+    # mercado opcionales pueden faltar sin descartar la cripto
+    mercado = [c for c in COLUMNAS_MERCADO if c in disponibles]
+    with tramo("load", origen="almacen") as t:
+        df = almacen.leer(required_cols + mercado).dropna(subset=required_cols)
+        t["filas"] = len(df)
+    print(f"Criptos validas cargadas: {len(df)}")
+    return df, features
+
+
+def construir_features(
+    df: pd.DataFrame,
+    features: list,
+    btc: dict | None = None,
+    series: AlmacenSeries | None = None
+) -> tuple[pd.DataFrame, list]:
+    with tramo("feature", filas=len(df)):
+        btc = btc or obtener_variacion_btc()
+        df = df.copy()
+        for col in BTC_FEATURES:
+            df[col] = btc[col]
+        features = features + BTC_FEATURES
+
+        # Indicadores de las series guardadas (cacheados por version); las criptos
+        # sin historial quedan con NaN, que los arboles tratan como faltante. Solo
+        # se usan los indicadores con algun valor (p. ej. sin bitcoin no hay beta)
+        df = df.join(cargar_indicadores(series), on="id")
+        con_datos = [c for c in INDICADORES if df[c].notna().any()]
+    if con_datos:
+        features = features + con_datos
+        print(f"Indicadores de series: {df[con_datos].notna().any(axis=1).sum()} criptos con historial")
+    return df, features
+
+
+def version_features(almacen: AlmacenCriptos, series: AlmacenSeries) -> str:
+    return f"{almacen.version()}-{series.version()}"
+
+
+def guardar_features(df: pd.DataFrame, features: list, version: str):
+    meta = {"version": version, "features": features}
+    columnas = COLUMNAS_ID + features + [
+        c for c in list(INDICADORES) + COLUMNAS_MERCADO if c in df.columns and c not in features
+    ]
+    tabla = df[columnas].reset_index(drop=True)
+    escribir_atomico(FEATURES_CACHE, lambda tmp: tabla.to_parquet(tmp, index=False))
+    escribir_atomico(FEATURES_CACHE + ".json", lambda tmp: _escribir_json(tmp, meta))
+
+
+def cargar_features(version: str | None = None) -> tuple[pd.DataFrame, list] | None:
+    # Devuelve el frame cacheado si existe y corresponde a la version de datos pedida
+    try:
+        with open(FEATURES_CACHE + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if version is not None and meta.get("version") != version:
+        return None
+    return pd.read_parquet(FEATURES_CACHE), meta["features"]
+
+
+def _escribir_json(ruta: str, datos, indent=None):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=indent, ensure_ascii=False)
+
+
+# === ENTRENAMIENTO ===
+def columna_plazo(plazo: str) -> str:
+    return columna_cambio(PLAZOS[plazo])
+
+
+def plazos_disponibles(df: pd.DataFrame) -> list:
+    # Modelos anteriores, sin plazos_: sin datos del cambio a 1 año solo se puntuan 24h y 30d
+    return [p for p in PLAZOS_MODELO if columna_plazo(p) in df.columns and df[columna_plazo(p)].notna().any()]
+
+
+def plazos_modelo(model, df: pd.DataFrame) -> list:
+    plazos = getattr(model, "plazos_", None)
+    return list(plazos) if plazos else plazos_disponibles(df)
+
+
+def fotos_entrenamiento(series: AlmacenSeries | None = None) -> tuple[pd.DataFrame, list]:
+    # Filas (cripto, dia, plazo) de las fotos de data/series con resultado ya
+    # conocido: target = subida futura en el plazo. Mismas fotos que el backtest
+    from cryptored.backtest import (
+        FEATURES as FEATURES_FOTO, MIN_POSITIVOS, MUESTREO_DIAS, VENTANA_ENTRENAMIENTO, foto, preparar_datos,
+        variacion_futura
+    )
+
+    series = series or AlmacenSeries()
+    with tramo("feature", origen="series") as t:
+        datos = preparar_datos(series, horizonte=1)
+        ultimo = len(datos["dias"]) - 1
+        bloques = []
+        print("Distribucion de clases (subida futura):")
+        for plazo, (dias, subida) in PLAZOS_MODELO.items():
+            con_futuro = {**datos, "futuro": variacion_futura(datos["current_price"], dias)}
+            # Del ultimo dia resuelto hacia atras; los primeros 30 no tienen variacion mensual
+            resueltos = range(ultimo - dias, max(30, ultimo - dias - VENTANA_ENTRENAMIENTO) - 1, -MUESTREO_DIAS)
+            fotos = [f for f in (foto(con_futuro, d) for d in resueltos) if len(f)]
+            tabla = pd.concat(fotos, ignore_index=True) if fotos else None
+            if tabla is not None:
+                tabla = tabla[np.isfinite(tabla["futuro"].to_numpy())]
+            y = tabla["futuro"] > subida if tabla is not None else pd.Series(dtype=bool)
+            if y.sum() < MIN_POSITIVOS or (~y).sum() < MIN_POSITIVOS:
+                print(f"{plazo}: historial insuficiente ({len(y)} fotos resueltas), no se entrena")
+                continue
+            print(f"{plazo}: {int(y.sum())} positivas de {len(y)}")
+            bloques.append(tabla.assign(target=y, horizonte_dias=dias, plazo=plazo))
+        t["filas"] = sum(len(b) for b in bloques)
+    if not any(b["plazo"].iloc[0] == PLAZO_PRINCIPAL for b in bloques):
+        raise ValueError(
+            f"Historial insuficiente en {series.directorio} para entrenar el plazo {PLAZO_PRINCIPAL} "
+            f"({len(datos['dias'])} dias); ejecuta el extractor para acumular series"
+        )
+    fotos = pd.concat(bloques, ignore_index=True)
+    return fotos, [c for c in FEATURES_FOTO if fotos[c].notna().any()]
+
+
+def apilar(df: pd.DataFrame, features: list, plazos: list) -> pd.DataFrame:
+    # Matriz (plazos x criptos) filas: bloque k = features de todas las criptos
+    # mas la duracion del plazo k
+    base = df[features].to_numpy(dtype=np.float64)
+    n = len(df)
+    X = np.empty((len(plazos) * n, base.shape[1] + len(FEATURES_PLAZO)))
+    for k, plazo in enumerate(plazos):
+        bloque = slice(k * n, (k + 1) * n)
+        X[bloque, :base.shape[1]] = base
+        X[bloque, -1] = PLAZOS_MODELO[plazo][0]
+    return pd.DataFrame(X, columns=list(features) + FEATURES_PLAZO)
+
+
+def crear_modelo(backend: str = BACKEND_DEFECTO, n_jobs: int = -1):
+    if backend == "bosque":
+        from sklearn.ensemble import RandomForestClassifier
+
+        return RandomForestClassifier(
+            n_estimators=ARBOLES,
+            max_depth=12,
+            random_state=42,
+            class_weight="balanced",
+            n_jobs=n_jobs
+        )
+    if backend == "gradiente":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        return HistGradientBoostingClassifier(
+            max_iter=ARBOLES,
+            learning_rate=0.1,
+            max_leaf_nodes=31,
+            early_stopping=False,
+            random_state=42,
+            class_weight="balanced"
+        )
+    raise ValueError(f"Backend desconocido: {backend}. Usa uno de {', '.join(BACKENDS)}")
+
+
+def backend_de(model) -> str | None:
+    nombre = type(model).__name__
+    if nombre == "RandomForestClassifier":
+        return "bosque"
+    if nombre == "HistGradientBoostingClassifier":
+        return "gradiente"
+    return None
+
+
+def ampliar_modelo(model, features: list, backend: str, y=None, incremento: int = ARBOLES_INCREMENTO) -> bool:
+    # Prepara el modelo guardado para seguir agregando arboles (warm_start).
+    # Devuelve False si hay que entrenar desde cero.
+    if backend_de(model) != backend:
+        return False
+    if list(getattr(model, "feature_names_in_", [])) != features:
+        return False
+    parametro = "n_estimators" if backend == "bosque" else "max_iter"
+    actual = model.get_params()[parametro]
+    if actual + incremento > MAX_ARBOLES:
+        return False
+    model.set_params(warm_start=True, **{parametro: actual + incremento})
+    if backend == "bosque":
+        model.set_params(n_jobs=-1)
+        if y is not None:
+            # "balanced" no se admite con warm_start: se fijan los pesos de los datos actuales
+            from sklearn.utils.class_weight import compute_class_weight
+
+            clases = model.classes_
+            pesos = compute_class_weight("balanced", classes=clases, y=y)
+            model.set_params(class_weight=dict(zip(clases, pesos)))
+    return True
+
+
+def entrenar(fotos: pd.DataFrame, features: list, backend: str = BACKEND_DEFECTO, previo=None):
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+
+    # fotos: salida de fotos_entrenamiento, una fila por cripto, dia y plazo
+    X = fotos[features + FEATURES_PLAZO]
+    y = fotos["target"]
+    features = list(X.columns)
+
+    try:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.3, random_state=42, stratify=y
+        )
+    except ValueError:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.3, random_state=42
+        )
+
+    if previo is not None and ampliar_modelo(previo, features, backend, y_train):
+        model = previo
+        print(f"Ampliando modelo existente ({backend}) con {ARBOLES_INCREMENTO} arboles")
+    else:
+        model = crear_modelo(backend)
+        print(f"Entrenando modelo {type(model).__name__}")
+    with tramo("fit", backend=backend, filas=len(X_train), features=len(features)):
+        model.fit(X_train, y_train)
+    model.plazos_ = list(dict.fromkeys(fotos["plazo"]))
+
+    print("\nReporte de clasificacion\n")
+    print(classification_report(y_test, model.predict(X_test)))
+    return model
+
+
+# === PUNTUACION ===
+def puntuar(df: pd.DataFrame, model, features: list, reglas: list = REGLAS) -> pd.DataFrame:
+    # features: columnas del modelo. Un modelo por plazos (con FEATURES_PLAZO)
+    # deja score_<plazo> para todos los plazos en un solo predict; uno anterior
+    # solo el score del plazo principal
+    df = df.copy()
+    with tramo("predict", filas=len(df), modelo=type(model).__name__):
+        if FEATURES_PLAZO[0] in features:
+            plazos = plazos_modelo(model, df)
+            base = [c for c in features if c not in FEATURES_PLAZO]
+            X = apilar(df, base, plazos)
+            p = model.predict_proba(X)[:, 1].reshape(len(plazos), len(df))
+            for k, plazo in enumerate(plazos):
+                df[f"score_{plazo}"] = p[k]
+            df["score"] = df[f"score_{PLAZO_PRINCIPAL}"]
+        else:
+            df["score"] = model.predict_proba(df[features])[:, 1]
+    df["predicted"] = df["score"] >= UMBRAL_PROBABILIDAD
+    with tramo("reason", filas=len(df)):
+        df["reason"] = generar_razones(df, reglas)
+    return df
+
+
+# === PERSISTENCIA Y PUBLICACION ===
+def guardar_modelo(model, destino: str | None = None):
+    import joblib
+
+    ruta_modelo = ruta_publicada(OUTPUT_MODEL, destino)
+    escribir_atomico(ruta_modelo, lambda tmp: joblib.dump(model, tmp))
+    print(f"Modelo guardado en: {ruta_modelo}")
+    ruta_arboles = exportar_arboles(model, ruta_publicada(OUTPUT_ARBOLES, destino))
+    print(f"Modelo compacto exportado en: {ruta_arboles}")
+
+
+def cargar_modelo():
+    import joblib
+
+    if not os.path.exists(OUTPUT_MODEL):
+        raise FileNotFoundError(f"No existe el modelo entrenado: {OUTPUT_MODEL}. Ejecuta 'train' primero")
+    return joblib.load(OUTPUT_MODEL)
+
+
+def cargar_predictor():
+    # Para puntuar basta el formato compacto (arranque rapido, mmap); si no existe
+    # o es de un formato anterior se usa el pickle de sklearn
+    with tramo("load", origen="modelo"):
+        if os.path.exists(os.path.join(OUTPUT_ARBOLES, "meta.json")):
+            try:
+                return ModeloArboles(OUTPUT_ARBOLES)
+            except ValueError as e:
+                print(f"[WARN] Modelo compacto no disponible: {e}")
+        return cargar_modelo()
+
+
+def ruta_publicada(ruta: str, destino: str | None = None) -> str:
+    return ruta if destino is None else os.path.join(destino, os.path.basename(ruta))
+
+
+def publicar(df: pd.DataFrame, reportes: tuple = (), destino: str | None = None) -> pd.DataFrame:
+    # Excel/CSV/HTML quedan fuera del camino critico: los formatos pedidos en
+    # "reportes" se generan en un proceso aparte (ver cryptored/reportes.py)
+    df_out = df[COLUMNAS_SALIDA + [c for c in SCORES_PLAZO + COLUMNAS_MERCADO if c in df.columns]]
+    salida_json = ruta_publicada(OUTPUT_JSON, destino)
+    with tramo("export", filas=len(df_out)) as t:
+        escribir_atomico(ruta_publicada(PUNTUADAS, destino), lambda tmp: df_out.to_parquet(tmp, index=False))
+
+        recomendadas = df_out[df_out["predicted"] == True]
+        tamano = exportar_predicciones(recomendadas, salida_json)
+        exportar_perfiles(recomendadas, ruta_publicada(DIRECTORIO_PERFILES, destino))
+        t["bytes_json"] = tamano
+
+    print(f"JSON generado para frontend: {salida_json} ({tamano / 1024:.1f} KB)")
+    print(f"Total recomendadas: {len(recomendadas)} (umbral {UMBRAL_PROBABILIDAD})")
+    if reportes:
+        from cryptored.reportes import lanzar_en_segundo_plano
+        lanzar_en_segundo_plano(reportes)
+    return df_out
+
+
+def cargar_puntuadas() -> pd.DataFrame:
+    if not os.path.exists(PUNTUADAS):
+        raise FileNotFoundError(f"No hay criptos puntuadas: {PUNTUADAS}. Ejecuta 'train' o 'score' primero")
+    return pd.read_parquet(PUNTUADAS)
+
+
+# === PIPELINES ===
+def entrenar_y_publicar(
+    reglas: list = REGLAS,
+    backend: str = BACKEND_DEFECTO,
+    incremental: bool = False,
+    reportes: tuple = (),
+    destino: str | None = None
+) -> pd.DataFrame:
+    os.makedirs("data", exist_ok=True)
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend}. Usa uno de {', '.join(BACKENDS)}")
+    previo = None
+    if incremental and os.path.exists(OUTPUT_MODEL):
+        previo = cargar_modelo()
+    almacen = AlmacenCriptos(json_origen=INPUT_JSON)
+    series = AlmacenSeries()
+    df, features = cargar_datos(almacen)
+    df, features = construir_features(df, features, series=series)
+    guardar_features(df, features, version_features(almacen, series))
+
+    # Se entrena con el pasado de las series y se puntua la foto de hoy; solo
+    # con las columnas que la foto de hoy tambien tiene
+    fotos, columnas = fotos_entrenamiento(series)
+    model = entrenar(fotos, [c for c in columnas if c in df.columns], backend, previo)
+    df = puntuar(df, model, list(model.feature_names_in_), reglas)
+    guardar_modelo(model, destino)
+    return publicar(df, reportes, destino)
+
+
+def puntuar_y_publicar(
+    reglas: list = REGLAS, reportes: tuple = (), destino: str | None = None
+) -> pd.DataFrame:
+    # Reutiliza el modelo persistido; solo recalcula features si cambiaron los datos
+    model = cargar_predictor()
+    if destino is not None:
+        # La version nueva lleva el mismo modelo que la vigente
+        for ruta in ARTEFACTOS_MODELO:
+            incluir(ruta, destino)
+    almacen = AlmacenCriptos(json_origen=INPUT_JSON)
+    series = AlmacenSeries()
+    version = version_features(almacen, series)
+    with tramo("load", origen="features"):
+        cache = cargar_features(version)
+    if cache is not None:
+        print(f"Features reutilizadas desde cache: {FEATURES_CACHE}")
+        df, features = cache
+    else:
+        anterior = cargar_features()
+        btc = {c: float(anterior[0][c].iloc[0]) for c in BTC_FEATURES} if anterior and len(anterior[0]) else None
+        df, features = cargar_datos(almacen)
+        df, features = construir_features(df, features, btc, series)
+        guardar_features(df, features, version)
+
+    columnas_modelo = list(getattr(model, "feature_names_in_", features))
+    if any(c not in df.columns for c in columnas_modelo if c not in FEATURES_PLAZO):
+        raise ValueError("Las features del modelo no coinciden con los datos; vuelve a entrenar con 'train'")
+    return publicar(puntuar(df, model, columnas_modelo, reglas), reportes, destino)
@@ -0,0 +1,130 @@
+import numpy as np
+
+from cryptored.cache import CacheLRU
+from cryptored.series import AlmacenSeries
+from cryptored.simulacion import MIN_DIAS, VENTANA_DIAS, cargar_retornos
+
+# Optimizador de portafolio sobre retornos diarios guardados. La covarianza se
+# estima con shrinkage de Ledoit-Wolf y se cachea por version de las series.
+# Metodos (todos long-only, pesos que suman 1):
+#   media_varianza  max  mu'w - (aversion/2) w'Sw  (gradiente proyectado al simplex)
+#   max_sharpe      mejor Sharpe sobre una grilla de aversiones de media_varianza
+#   paridad_riesgo  igual contribucion al riesgo de cada cripto
+
+METODO_POR_RIESGO = {"leve": "paridad_riesgo", "moderado": "max_sharpe", "volatil": "media_varianza"}
+AVERSION = {"volatil": 10.0}
+AVERSION_DEFECTO = 25.0
+SHRINK_MEDIA = 0.5  # mezcla la media historica de cada cripto con la media del grupo
+ITERACIONES = 300
+MIN_CRIPTOS = 2
+
+_cache_covarianza = CacheLRU(max_entradas=128, ttl=None)
+
+
+def ledoit_wolf(X: np.ndarray) -> tuple[np.ndarray, float]:
+    # X: (dias x criptos). Shrinkage hacia m*I (Ledoit & Wolf, 2004)
+    T, n = X.shape
+    X = X - X.mean(axis=0)
+    S = X.T @ X / T
+    m = np.trace(S) / n
+    d2 = ((S - m * np.eye(n)) ** 2).sum() / n
+    normas = (X ** 2).sum(axis=1)
+    b2_barra = ((normas ** 2).sum() / T - (S ** 2).sum()) / (T * n)
+    b2 = min(b2_barra, d2)
+    shrink = b2 / d2 if d2 > 0 else 1.0
+    return shrink * m * np.eye(n) + (1 - shrink) * S, float(shrink)
+
+
+def estimar(coin_ids: list, ventana: int = VENTANA_DIAS, almacen: AlmacenSeries | None = None):
+    # Devuelve (ids con historial, mu, Sigma, shrink) o None; cacheado por version de series
+    almacen = almacen or AlmacenSeries()
+    clave = (almacen.directorio, almacen.version(), tuple(coin_ids), ventana)
+
+    def calcular():
+        ids, log_ret = cargar_retornos(list(coin_ids), ventana, almacen)
+        if len(ids) < MIN_CRIPTOS or log_ret.shape[1] < MIN_DIAS:
+            return None
+        R = np.expm1(log_ret).T  # dias x criptos, retornos simples
+        medias = R.mean(axis=0)
+        mu = (1 - SHRINK_MEDIA) * medias + SHRINK_MEDIA * medias.mean()
+        sigma, shrink = ledoit_wolf(R)
+        return ids, mu, sigma, shrink
+
+    return _cache_covarianza.obtener_o_calcular(clave, calcular)
+
+
+def proyectar_simplex(v: np.ndarray) -> np.ndarray:
+    # Proyeccion euclidiana sobre {w >= 0, sum(w) = 1} (Duchi et al., 2008)
+    u = np.sort(v)[::-1]
+    acumulado = np.cumsum(u) - 1
+    rho = np.nonzero(u * np.arange(1, len(v) + 1) > acumulado)[0][-1]
+    theta = acumulado[rho] / (rho + 1)
+    return np.maximum(v - theta, 0)
+
+
+def _autovalor_max(S: np.ndarray, iteraciones: int = 30) -> float:
+    v = np.ones(len(S)) / np.sqrt(len(S))
+    for _ in range(iteraciones):
+        v = S @ v
+        v /= np.linalg.norm(v) or 1.0
+    return float(v @ S @ v)
+
+
+def media_varianza(mu, S, aversion: float, w0=None, L: float | None = None) -> np.ndarray:
+    n = len(mu)
+    w = np.full(n, 1 / n) if w0 is None else w0
+    paso = 1 / (aversion * (L or _autovalor_max(S)))
+    for _ in range(ITERACIONES):
+        w_nuevo = proyectar_simplex(w + paso * (mu - aversion * (S @ w)))
+        if np.abs(w_nuevo - w).max() < 1e-9:
+            return w_nuevo
+        w = w_nuevo
+    return w
+
+
+def max_sharpe(mu, S) -> np.ndarray:
+    L = _autovalor_max(S)
+    mejor, mejor_sharpe, w = None, -np.inf, None
+    # De aversion alta (minima varianza) a baja, reutilizando la solucion anterior
+    for aversion in np.logspace(3, -1, 25):
+        w = media_varianza(mu, S, aversion, w, L)
+        sharpe = (mu @ w) / np.sqrt(w @ S @ w)
+        if sharpe > mejor_sharpe:
+            mejor, mejor_sharpe = w, sharpe
+    return mejor
+
+
+def paridad_riesgo(S) -> np.ndarray:
+    # Newton amortiguado sobre 1/2 x'Sx - b*sum(log x) (Spinu, 2013): converge
+    # aun con covarianzas negativas y en pocas iteraciones para cientos de criptos
+    n = len(S)
+    b = np.full(n, 1 / n)
+    x = 1 / np.sqrt(np.diag(S))
+    x /= np.sqrt(x @ S @ x)
+    for _ in range(50):
+        g = S @ x - b / x
+        H = S + np.diag(b / x ** 2)
+        dx = np.linalg.solve(H, g)
+        decremento = np.sqrt(max(dx @ g, 0.0))
+        x = x - dx / (1 + decremento) if decremento > 0.95 else x - dx
+        if decremento < 1e-10:
+            break
+    return x / x.sum()
+
+
+def optimizar(coin_ids: list, riesgo: str, metodo: str | None = None, ventana: int = VENTANA_DIAS) -> dict | None:
+    # Devuelve {coin_id: peso} para las criptos con historial suficiente, o None
+    metodo = metodo or METODO_POR_RIESGO.get(riesgo, "max_sharpe")
+    estimacion = estimar(coin_ids, ventana)
+    if estimacion is None:
+        return None
+    ids, mu, S, _ = estimacion
+    if metodo == "paridad_riesgo":
+        w = paridad_riesgo(S)
+    elif metodo == "max_sharpe":
+        w = max_sharpe(mu, S)
+    elif metodo == "media_varianza":
+        w = media_varianza(mu, S, AVERSION.get(riesgo, AVERSION_DEFECTO))
+    else:
+        raise ValueError(f"Metodo de optimizacion invalido: {metodo}")
+    return dict(zip(ids, w))
@@ -0,0 +1,74 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+# Reglas de explicacion compartidas por modelo.py y scripts/modelo_general.py.
+# Cada grupo se evalua como una cadena if/elif (gana la primera regla que se
+# cumpla) y los textos de todos los grupos se unen con " | ". Una regla es
+# (condiciones, texto); si falta alguna columna de la regla, la regla se omite.
+
+OPERADORES = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+REGLAS = [
+    [
+        ([("price_change_30d", ">", 100)], "Explosion mensual (+100%)"),
+        ([("price_change_30d", ">", 60)], "Crecimiento mensual sobresaliente (+60%)"),
+        ([("price_change_30d", ">", 30)], "Buen rendimiento mensual (+30%)"),
+    ],
+    [
+        ([("price_change_7d", ">", 10)], "Fuerte tendencia semanal (+10%)"),
+        ([("price_change_7d", ">", 5)], "Tendencia semanal positiva"),
+    ],
+    [
+        ([("volume_24h", ">", 5e8)], "Volumen extremadamente alto"),
+        ([("volume_24h", ">", 1e8)], "Volumen alto"),
+    ],
+    [
+        ([("market_cap_rank", "<=", 10)], "Top 10 por capitalizacion"),
+        ([("market_cap_rank", "<=", 100)], "Top 100 por capitalizacion"),
+    ],
+    [
+        ([("score", ">", 0.8)], "Alta confianza del modelo"),
+        ([("score", ">", 0.6)], "Buena puntuacion en analisis multivariable"),
+    ],
+    [
+        ([("btc_change_30d", "<", 0), ("price_change_30d", ">", 0)], "Destacando pese a caida de BTC"),
+    ],
+]
+
+RAZON_DEFECTO = "Recomendacion por analisis multivariable"
+SEPARADOR = " | "
+
+
+def _mascara(df: pd.DataFrame, condiciones: list) -> np.ndarray | None:
+    if any(col not in df.columns for col, _, _ in condiciones):
+        return None
+    mascara = np.ones(len(df), dtype=bool)
+    for col, op, umbral in condiciones:
+        valores = df[col].to_numpy(dtype=float)
+        mascara &= OPERADORES[op](valores, umbral)  # NaN nunca cumple
+    return mascara
+
+
+def generar_razones(df: pd.DataFrame, reglas: list = REGLAS, columna_prediccion: str = "predicted") -> np.ndarray:
+    # Devuelve un arreglo de textos; las filas no recomendadas quedan vacias
+    n = len(df)
+    razones = np.full(n, "", dtype=object)
+    for grupo in reglas:
+        mascaras, textos = [], []
+        for condiciones, texto in grupo:
+            mascara = _mascara(df, condiciones)
+            if mascara is not None:
+                mascaras.append(mascara)
+                textos.append(texto)
+        if not mascaras:
+            continue
+        parte = np.select(mascaras, textos, default="").astype(object)
+        con_parte = parte != ""
+        unir = con_parte & (razones != "")
+        razones = np.where(unir, razones + SEPARADOR + parte, np.where(con_parte, parte, razones))
+
+    predicho = df[columna_prediccion].to_numpy(dtype=bool) if columna_prediccion in df.columns else np.ones(n, bool)
+    razones = np.where(predicho & (razones == ""), RAZON_DEFECTO, razones)
+    return np.where(predicho, razones, "").astype(object)
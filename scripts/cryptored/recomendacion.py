@@ -0,0 +1,42 @@
+import json
+
+from cryptored.mercado import PLAZOS, columna_cambio
+
+# Recomendacion generica sobre el JSON ya publicado. Solo usa la libreria
+# estandar para que listar el top no pague la importacion de pandas/sklearn.
+
+OUTPUT_JSON = "public/data/criptos_predichas.json"
+COLUMNAS_PLAZO = {plazo: columna_cambio(h) for plazo, h in PLAZOS.items()}
+
+
+def cargar_recomendadas(ruta: str = OUTPUT_JSON) -> list:
+    with open(ruta, encoding="utf-8") as f:
+        return [r for r in json.load(f) if r.get("predicted")]
+
+
+def score_plazo(registro: dict, plazo: str) -> float:
+    # score_<plazo> del modelo por plazos; los JSON anteriores solo traen "score"
+    score = registro.get(f"score_{plazo}", registro["score"])
+    return score if score is not None else -1.0
+
+
+def top_por_plazo(plazo: str, top_n: int = 5, recomendadas: list | None = None) -> list:
+    if plazo not in COLUMNAS_PLAZO:
+        raise ValueError("Plazo invalido. Usa '24h', '30d' o '1a'.")
+    candidatos = recomendadas if recomendadas is not None else cargar_recomendadas()
+    return sorted(candidatos, key=lambda r: score_plazo(r, plazo), reverse=True)[:top_n]
+
+
+def recomendar_generico_por_plazo(plazo: str, top_n: int = 5, recomendadas: list | None = None) -> list:
+    seleccionadas = top_por_plazo(plazo, top_n, recomendadas)
+    col = COLUMNAS_PLAZO[plazo]
+
+    print(f"\n=== TOP {top_n} CRIPTOS RECOMENDADAS ({plazo.upper()}) ===\n")
+    for row in seleccionadas:
+        print(f"- {row['name']} ({row['symbol'].upper()}):")
+        print(f"  Precio actual: ${row['current_price']:.2f}")
+        if row.get(col) is not None:
+            print(f"  Rendimiento ({plazo}): {row[col]:.2f}%")
+        print(f"  Score del modelo: {score_plazo(row, plazo):.2f}")
+        print(f"  Razon: {row['reason']}\n")
+    return seleccionadas
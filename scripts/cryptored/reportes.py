@@ -0,0 +1,102 @@
+import html
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from cryptored.almacen import escribir_atomico
+from cryptored.modelado import cargar_puntuadas
+from cryptored.riesgo import RIESGOS, filtro_riesgo
+
+# Reportes para personas (Excel, CSV y resumen HTML) a partir de las criptos ya
+# puntuadas. No forman parte de entrenar/puntuar: se generan bajo demanda con
+# "modelo_general.py report" o en un proceso aparte al terminar de publicar.
+
+OUTPUT_EXCEL = "data/predicciones_criptos.xlsx"
+OUTPUT_CSV = "data/predicciones_criptos.csv"
+OUTPUT_HTML = "data/resumen_predicciones.html"
+LOG_SEGUNDO_PLANO = "data/reportes.log"
+FORMATOS = ("xlsx", "csv", "html")
+TOP_HTML = 25
+
+
+def _excel(df: pd.DataFrame, ruta: str):
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        print("[WARN] openpyxl no esta instalado; se omite el Excel")
+        return None
+
+    def escribir(tmp):
+        # El temporal no termina en .xlsx: se abre el escritor sobre el archivo
+        with open(tmp, "wb") as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
+            df.to_excel(writer, index=False)
+    escribir_atomico(ruta, escribir)
+    return ruta
+
+
+def _csv(df: pd.DataFrame, ruta: str):
+    escribir_atomico(ruta, lambda tmp: df.to_csv(tmp, index=False))
+    return ruta
+
+
+def _html(df: pd.DataFrame, ruta: str):
+    recomendadas = df[df["predicted"] == True]
+    perfiles = "".join(
+        f"<tr><td>{r}</td><td>{int(filtro_riesgo(recomendadas, r, '30d').sum())}</td></tr>" for r in RIESGOS
+    )
+    columnas = [c for c in ("name", "symbol", "current_price", "price_change_30d", "score", "reason") if c in df]
+    top = recomendadas.sort_values("score", ascending=False).head(TOP_HTML)[columnas]
+    cuerpo = f"""<!doctype html>
+<html lang="es"><head><meta charset="utf-8"><title>Resumen de predicciones</title></head>
+<body>
+<h1>Resumen de predicciones</h1>
+<p>Generado: {html.escape(time.strftime("%Y-%m-%d %H:%M:%S"))}</p>
+<p>Criptos puntuadas: {len(df)} &middot; recomendadas: {len(recomendadas)}</p>
+<h2>Candidatas por perfil (30d)</h2>
+<table border="1"><tr><th>Perfil</th><th>Criptos</th></tr>{perfiles}</table>
+<h2>Top {TOP_HTML} por score</h2>
+{top.to_html(index=False, float_format=lambda x: f"{x:.4f}")}
+</body></html>
+"""
+
+    def escribir(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(cuerpo)
+    escribir_atomico(ruta, escribir)
+    return ruta
+
+
+GENERADORES = {"xlsx": (_excel, OUTPUT_EXCEL), "csv": (_csv, OUTPUT_CSV), "html": (_html, OUTPUT_HTML)}
+
+
+def generar_reportes(formatos=FORMATOS, df: pd.DataFrame | None = None) -> list:
+    invalidos = [f for f in formatos if f not in GENERADORES]
+    if invalidos:
+        raise ValueError(f"Formato de reporte invalido: {', '.join(invalidos)}. Usa {', '.join(FORMATOS)}")
+    if df is None:
+        df = cargar_puntuadas()
+
+    generados = []
+    for formato in formatos:
+        generador, ruta = GENERADORES[formato]
+        inicio = time.perf_counter()
+        if generador(df, ruta):
+            generados.append(ruta)
+            print(f"Reporte {formato} generado: {ruta} ({time.perf_counter() - inicio:.2f}s)")
+    return generados
+
+
+def lanzar_en_segundo_plano(formatos=FORMATOS) -> subprocess.Popen:
+    # Proceso independiente: el pipeline publica y termina sin esperar los reportes
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modelo_general.py")
+    os.makedirs(os.path.dirname(LOG_SEGUNDO_PLANO), exist_ok=True)
+    with open(LOG_SEGUNDO_PLANO, "a", encoding="utf-8") as log:
+        proceso = subprocess.Popen(
+            [sys.executable, script, "report", "--formatos", ",".join(formatos)],
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+    print(f"Reportes en segundo plano (pid {proceso.pid}), salida en {LOG_SEGUNDO_PLANO}")
+    return proceso
@@ -0,0 +1,28 @@
+import pandas as pd
+
+# Filtros de candidatas por perfil de riesgo. Los comparten el portafolio, el
+# backtest y la exportacion por perfil del frontend. El score es el del plazo
+# (score_<plazo>) si el modelo lo calculo, si no el general.
+
+RIESGOS = ("leve", "moderado", "volatil")
+
+
+def columna_score(df: pd.DataFrame, plazo: str) -> str:
+    return f"score_{plazo}" if f"score_{plazo}" in df.columns else "score"
+
+
+def filtro_riesgo(df: pd.DataFrame, riesgo: str, plazo: str):
+    score = df[columna_score(df, plazo)]
+    # === FILTROS DIFERENCIADOS ===
+    if riesgo == "leve":
+        if plazo == "1a":
+            # Menos estricto: permite price_change_30d hasta 35 y score > 0.35
+            return (df["price_change_30d"] > 0) & (df["price_change_30d"] < 35) & (score > 0.35)
+        # Menos estricto: permite price_change_30d hasta 25 y score > 0.4
+        return (df["price_change_30d"] > 0) & (df["price_change_30d"] < 25) & (score > 0.4)
+    elif riesgo == "moderado":
+        # Más intermedio: price_change_30d > -15 y < 40, score > 0.3
+        return (df["price_change_30d"] > -15) & (df["price_change_30d"] < 40) & (score > 0.3)
+    elif riesgo == "volatil":
+        return (df["price_change_30d"] > -30) & (df["price_change_30d"] < 60) & (score > 0.2)
+    raise ValueError("Riesgo inválido: leve, moderado o volatil")
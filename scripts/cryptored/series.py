@@ -0,0 +1,126 @@
+import glob
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cryptored.almacen import escribir_atomico
+
+# Series diarias por cripto (precio, volumen, capitalizacion) en float32.
+# Cada descarga se agrega como una particion Parquet nueva (append-only); al leer
+# gana el ultimo valor de cada (coin_id, dia).
+
+DIRECTORIO = "data/series"
+DIAS_HISTORIAL = 90
+MAX_PARTICIONES = 64
+CAMPOS = ["price", "volume", "market_cap"]
+MS_POR_DIA = 86_400_000
+
+
+def dia_actual() -> int:
+    return int(time.time() // 86400)
+
+
+def serie_desde_market_chart(data: dict) -> pd.DataFrame:
+    # Convierte la respuesta de /market_chart en filas (dia, price, volume, market_cap)
+    precios = np.asarray(data.get("prices") or [], dtype=np.float64).reshape(-1, 2)
+    df = pd.DataFrame({
+        "dia": (precios[:, 0] // MS_POR_DIA).astype(np.int32),
+        "price": precios[:, 1].astype(np.float32),
+    })
+    for campo, clave in (("volume", "total_volumes"), ("market_cap", "market_caps")):
+        valores = np.asarray(data.get(clave) or [], dtype=np.float64).reshape(-1, 2)
+        df[campo] = valores[:, 1].astype(np.float32) if len(valores) == len(df) else np.float32(np.nan)
+    return df.drop_duplicates("dia", keep="last")
+
+
+class AlmacenSeries:
+    def __init__(self, directorio: str = DIRECTORIO):
+        self.directorio = directorio
+
+    def particiones(self) -> list:
+        return sorted(glob.glob(os.path.join(self.directorio, "part-*.parquet")))
+
+    def version(self) -> str:
+        h = hashlib.sha1()
+        for ruta in self.particiones():
+            st = os.stat(ruta)
+            h.update(f"{os.path.basename(ruta)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()[:16]
+
+    # === ESCRITURA ===
+    def agregar(self, series) -> int:
+        # series: {coin_id: DataFrame de serie_desde_market_chart} o un frame
+        # largo que ya trae la columna coin_id (cargas masivas)
+        if isinstance(series, pd.DataFrame):
+            df = series[["coin_id", "dia"] + CAMPOS].reset_index(drop=True)
+        else:
+            partes = [df.assign(coin_id=coin_id) for coin_id, df in series.items() if len(df)]
+            df = pd.concat(partes, ignore_index=True)[["coin_id", "dia"] + CAMPOS] if partes else None
+        if df is None or df.empty:
+            return 0
+        self._escribir(os.path.join(self.directorio, f"part-{time.time_ns()}-{os.getpid()}.parquet"), df)
+        if len(self.particiones()) > MAX_PARTICIONES:
+            self.compactar()
+        return len(df)
+
+    def _escribir(self, ruta: str, df: pd.DataFrame):
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        tabla = tabla.set_column(0, "coin_id", tabla.column("coin_id").dictionary_encode())
+        escribir_atomico(ruta, lambda tmp: pq.write_table(tabla, tmp, compression="zstd"))
+
+    def compactar(self):
+        particiones = self.particiones()
+        if len(particiones) < 2:
+            return
+        df = self._leer(particiones, None)
+        self._escribir(os.path.join(self.directorio, f"part-{time.time_ns()}-{os.getpid()}.parquet"), df)
+        for ruta in particiones:
+            os.remove(ruta)
+
+    # === LECTURA ===
+    def _leer(self, particiones: list, campos: list | None) -> pd.DataFrame:
+        columnas = ["coin_id", "dia"] + (campos if campos is not None else CAMPOS)
+        if not particiones:
+            return pd.DataFrame(columns=columnas)
+        tablas = [pq.read_table(r, columns=columnas, memory_map=True) for r in particiones]
+        tabla = pa.concat_tables(tablas, promote_options="permissive") if len(tablas) > 1 else tablas[0]
+        df = tabla.to_pandas()
+        df["coin_id"] = df["coin_id"].astype(str)
+        return df.drop_duplicates(["coin_id", "dia"], keep="last")
+
+    def ultimo_dia(self) -> dict:
+        df = self._leer(self.particiones(), [])
+        if df.empty:
+            return {}
+        return df.groupby("coin_id")["dia"].max().to_dict()
+
+    def matriz(self, campo: str = "price", coins: list | None = None, dias: int | None = None):
+        # Devuelve (coin_ids, dias, M) con M float32 de forma (coins x dias) y NaN en huecos
+        df = self._leer(self.particiones(), [campo])
+        if coins is not None:
+            df = df[df["coin_id"].isin(coins)]
+        if dias is not None and len(df):
+            df = df[df["dia"] > df["dia"].max() - dias]
+
+        if coins is not None:
+            ids = pd.Index(list(dict.fromkeys(coins)))
+        else:
+            ids = pd.Index(np.sort(df["coin_id"].unique()))
+        if df.empty:
+            return ids.tolist(), np.array([], dtype=np.int32), np.full((len(ids), 0), np.nan, dtype=np.float32)
+
+        eje_dias = np.arange(df["dia"].min(), df["dia"].max() + 1, dtype=np.int32)
+        filas = ids.get_indexer(df["coin_id"])
+        columnas = df["dia"].to_numpy() - eje_dias[0]
+        M = np.full((len(ids), len(eje_dias)), np.nan, dtype=np.float32)
+        M[filas, columnas] = df[campo].to_numpy(dtype=np.float32)
+        return ids.tolist(), eje_dias, M
+
+
+def cargar_matriz(campo: str = "price", coins: list | None = None, dias: int | None = None):
+    return AlmacenSeries().matriz(campo, coins, dias)
@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cryptored.cache import CacheLRU
+from cryptored.series import AlmacenSeries
+
+# Simulacion Monte Carlo de portafolios: remuestrea (bootstrap) dias completos
+# de retornos diarios historicos, de modo que se conserva la correlacion entre
+# criptos, y compone el valor del portafolio en cada punto de la proyeccion.
+
+VENTANA_DIAS = 90
+MIN_DIAS = 10
+CAMINOS = 2000
+SEMILLA = 42
+CAMINOS_POR_BLOQUE = 500
+# A partir de este numero de celdas (caminos x dias x criptos) se reparte en procesos
+UMBRAL_POOL = 20_000_000
+PERCENTILES = (5, 50, 95)
+NIVEL_VAR = 0.95
+
+_pool = None
+_cache_retornos = CacheLRU(max_entradas=64, ttl=600)
+
+
+def _obtener_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _pool
+
+
+def cargar_retornos(coin_ids: list, ventana: int = VENTANA_DIAS, almacen: AlmacenSeries | None = None):
+    # Log-retornos diarios (criptos x dias) de la ventana comun mas reciente.
+    # Devuelve (ids con historial, matriz); se cachea por version de las series
+    almacen = almacen or AlmacenSeries()
+    clave = (almacen.directorio, almacen.version(), tuple(coin_ids), ventana)
+
+    def calcular():
+        ids, _, precios = almacen.matriz("price", coins=coin_ids, dias=ventana + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            retornos = np.diff(np.log(precios.astype(np.float64)), axis=1)
+        validos = np.isfinite(retornos).sum(axis=1) >= MIN_DIAS
+        retornos = retornos[validos]
+        # Solo dias en que todas las criptos tienen dato, para remuestrear dias completos
+        dias_completos = np.isfinite(retornos).all(axis=0)
+        return [i for i, v in zip(ids, validos) if v], retornos[:, dias_completos]
+
+    return _cache_retornos.obtener_o_calcular(clave, calcular)
+
+
+def _simular_bloque(retornos: np.ndarray, pesos: np.ndarray, dias: np.ndarray, n: int, semilla) -> np.ndarray:
+    # Valor del portafolio (capital 1) en cada punto: matriz (n x len(dias))
+    rng = np.random.default_rng(semilla)
+    horizonte = int(np.ceil(dias.max())) if len(dias) else 0
+    if horizonte == 0:
+        return np.ones((n, len(dias)))
+    idx = rng.integers(0, retornos.shape[1], size=(n, horizonte))
+    acumulado = np.cumsum(retornos[:, idx], axis=2)  # criptos x caminos x dias
+    acumulado = np.concatenate([np.zeros(acumulado.shape[:2] + (1,)), acumulado], axis=2)
+    # Puntos fraccionarios (horas) se interpolan en log sobre el dia
+    piso = np.floor(dias).astype(int)
+    techo = np.minimum(piso + 1, horizonte)
+    frac = dias - piso
+    log_valor = acumulado[:, :, piso] * (1 - frac) + acumulado[:, :, techo] * frac
+    return np.einsum("c,cnd->nd", pesos, np.exp(log_valor))
+
+
+def simular_portafolio(
+    coin_ids: list,
+    pesos,
+    dias,
+    caminos: int = CAMINOS,
+    semilla: int = SEMILLA,
+    ventana: int = VENTANA_DIAS,
+) -> dict | None:
+    # dias: dia (puede ser fraccionario) de cada punto de la proyeccion
+    dias = np.asarray(dias, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    ids, retornos = cargar_retornos(list(coin_ids), ventana)
+    if not ids or retornos.shape[1] < MIN_DIAS:
+        return None
+
+    posicion = {c: i for i, c in enumerate(coin_ids)}
+    pesos_sim = pesos[[posicion[c] for c in ids]]
+    cobertura = float(pesos_sim.sum() / pesos.sum()) if pesos.sum() > 0 else 0.0
+    if pesos_sim.sum() <= 0:
+        return None
+    pesos_sim = pesos_sim / pesos_sim.sum()
+
+    # Bloques con semillas derivadas: el resultado no depende del numero de procesos
+    bloques = [min(CAMINOS_POR_BLOQUE, caminos - i) for i in range(0, caminos, CAMINOS_POR_BLOQUE)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(bloques))
+    celdas = caminos * max(dias.max(), 1) * len(ids)
+    if celdas > UMBRAL_POOL and len(bloques) > 1:
+        pool = _obtener_pool()
+        futuros = [pool.submit(_simular_bloque, retornos, pesos_sim, dias, n, s) for n, s in zip(bloques, semillas)]
+        valores = np.vstack([f.result() for f in futuros])
+    else:
+        valores = np.vstack([_simular_bloque(retornos, pesos_sim, dias, n, s) for n, s in zip(bloques, semillas)])
+
+    bandas = np.percentile(valores, PERCENTILES, axis=0)
+    retorno_final = valores[:, -1] - 1
+    corte = np.quantile(retorno_final, 1 - NIVEL_VAR)
+    cola = retorno_final[retorno_final <= corte]
+    return {
+        "caminos": caminos,
+        "semilla": semilla,
+        "dias_historial": int(retornos.shape[1]),
+        "cobertura": round(cobertura, 4),
+        "simuladas": ids,
+        "bandas": {f"p{p}": bandas[k] for k, p in enumerate(PERCENTILES)},
+        "var": float(-corte),
+        "cvar": float(-cola.mean()) if len(cola) else float(-corte),
+        "prob_perdida": float((retorno_final < 0).mean()),
+    }
+
+
+def escalar_simulacion(sim: dict | None, capital: float) -> dict | None:
+    # La simulacion se hace con capital 1; aqui se lleva a montos redondeados
+    if sim is None:
+        return None
+    return {
+        "caminos": sim["caminos"],
+        "semilla": sim["semilla"],
+        "dias_historial": sim["dias_historial"],
+        "cobertura": sim["cobertura"],
+        "simuladas": sim["simuladas"],
+        "bandas": {k: np.round(v * capital, 2).tolist() for k, v in sim["bandas"].items()},
+        "var_95": round(sim["var"] * capital, 2),
+        "cvar_95": round(sim["cvar"] * capital, 2),
+        "var_95_pct": round(sim["var"] * 100, 2),
+        "cvar_95_pct": round(sim["cvar"] * 100, 2),
+        "prob_perdida": round(sim["prob_perdida"], 4),
+    }
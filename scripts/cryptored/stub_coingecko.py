@@ -0,0 +1,165 @@
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Servidor local que imita los endpoints de CoinGecko usados por los scripts.
+# Sirve datos sinteticos deterministas para pruebas y benchmarks sin red.
+
+RUTA_CHART = re.compile(r"^/coins/([^/]+)/market_chart$")
+RUTA_COIN = re.compile(r"^/coins/([^/]+)$")
+RUTA_ID = re.compile(r"^coin-(\d+)$")
+
+
+def _moneda(indice: int, moneda: str = "usd") -> dict:
+    rnd = random.Random(indice)
+    precio = round(10 ** rnd.uniform(-4, 5), 6)
+    volumen = rnd.uniform(0.5, 2)
+    cambios = {
+        "24h": rnd.gauss(0, 4), "7d": rnd.gauss(1, 10), "30d": rnd.gauss(3, 25),
+        # Una de cada diez es "nueva" y no tiene variacion a 1 año
+        "1y": rnd.gauss(20, 80) if indice % 10 != 9 else None,
+    }
+    # Otra moneda: el precio escala por un tipo de cambio fijo y cada variacion
+    # se compone con la del tipo de cambio en ese horizonte
+    tipo = 1.0 if moneda == "usd" else random.Random(moneda).uniform(0.5, 2.0)
+    for h, c in cambios.items():
+        if moneda != "usd" and c is not None:
+            fx = random.Random(f"{moneda}-{h}").gauss(0, 2)
+            cambios[h] = ((1 + c / 100) * (1 + fx / 100) - 1) * 100
+    return {
+        "id": f"coin-{indice}",
+        "name": f"Coin {indice}",
+        "symbol": f"c{indice}",
+        "image": f"https://example.invalid/coins/{indice}.png",
+        "market_cap": int(1e12 / (indice + 1) * tipo),
+        "market_cap_rank": indice + 1,
+        "current_price": precio * tipo,
+        "total_volume": int(1e10 / (indice + 1) * volumen * tipo),
+        **{f"price_change_percentage_{h}_in_currency": c for h, c in cambios.items()},
+    }
+
+
+def _serie(coin_id: str, dias: int) -> list:
+    rnd = random.Random(coin_id)
+    ahora = int(time.time() // 86400) * 86400 * 1000
+    precio = 10 ** rnd.uniform(-4, 5)
+    deriva, vol = rnd.gauss(0, 0.003), rnd.uniform(0.01, 0.08)
+    puntos = []
+    for d in range(dias, -1, -1):
+        precio *= math.exp(rnd.gauss(deriva, vol))
+        puntos.append([ahora - d * 86400 * 1000, precio])
+    return puntos
+
+
+class ManejadorStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, estado: int, cuerpo, cabeceras: dict | None = None):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        # ETag del cuerpo: una peticion condicional sin cambios recibe 304 sin cuerpo
+        etag = f'"{hashlib.sha1(datos).hexdigest()[:16]}"'
+        if estado == 200 and self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.no_modificadas += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(estado)
+        if estado == 200:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.llamadas += 1
+        if srv.latencia:
+            time.sleep(srv.latencia)
+        if srv.prob_429 and random.random() < srv.prob_429:
+            return self._responder(429, {"error": "rate limited"}, {"Retry-After": "0.1"})
+
+        url = urlparse(self.path)
+        ruta = url.path
+        if ruta.startswith(srv.prefijo):
+            ruta = ruta[len(srv.prefijo):]
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if ruta == "/coins/markets":
+            moneda = q.get("vs_currency", "usd").lower()
+            if "ids" in q:
+                # "bitcoin" es la primera del ranking (la cripto puente de las conversiones)
+                filas = []
+                for coin_id in q["ids"].split(","):
+                    m = RUTA_ID.match(coin_id)
+                    if coin_id == "bitcoin" or m:
+                        fila = _moneda(int(m.group(1)) if m else 0, moneda)
+                        filas.append({**fila, "id": coin_id})
+                return self._responder(200, filas)
+            por_pagina = int(q.get("per_page", 50))
+            pagina = int(q.get("page", 1))
+            inicio = (pagina - 1) * por_pagina
+            fin = min(inicio + por_pagina, srv.total_monedas)
+            return self._responder(200, [_moneda(i, moneda) for i in range(inicio, fin)])
+
+        m = RUTA_CHART.match(ruta)
+        if m:
+            dias = int(q.get("days", 7))
+            precios = _serie(m.group(1), dias)
+            volumenes = [[t, abs(p) * 1e6] for t, p in precios]
+            caps = [[t, abs(p) * 1e8] for t, p in precios]
+            return self._responder(200, {"prices": precios, "total_volumes": volumenes, "market_caps": caps})
+
+        m = RUTA_COIN.match(ruta)
+        if m:
+            rnd = random.Random(m.group(1))
+            return self._responder(200, {"id": m.group(1), "market_data": {
+                "price_change_percentage_7d": rnd.gauss(0, 5),
+                "price_change_percentage_30d": rnd.gauss(0, 10),
+            }})
+
+        self._responder(404, {"error": "not found"})
+
+
+def iniciar_stub(puerto: int = 0, latencia: float = 0.05, total_monedas: int = 1000, prob_429: float = 0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", puerto), ManejadorStub)
+    server.daemon_threads = True
+    server.latencia = latencia
+    server.total_monedas = total_monedas
+    server.prob_429 = prob_429
+    server.prefijo = "/api/v3"
+    server.llamadas = 0
+    server.no_modificadas = 0
+    server.lock = threading.Lock()
+    hilo = threading.Thread(target=server.serve_forever, daemon=True)
+    hilo.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+    return server, url
+
+
+if __name__ == "__main__":
+    import sys
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, url = iniciar_stub(puerto)
+    print(f"[INFO] Stub de CoinGecko escuchando en {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
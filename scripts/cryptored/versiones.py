@@ -0,0 +1,197 @@
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from cryptored.almacen import escribir_atomico
+
+# Versiones publicadas de los datos y del modelo. Cada ciclo del programador
+# escribe sus salidas en data/versiones/<id>.tmp y lo renombra a
+# data/versiones/<id>; publicar es cambiar el enlace simbolico
+# data/versiones/actual -> <id> con un solo os.replace. Las rutas de siempre
+# (public/data/..., data/puntuadas, data/modelo_criptos.pkl) son enlaces fijos a
+# data/versiones/actual/<nombre>: el mismo cambio publica todo a la vez, y
+# volver a una version anterior (activar) devuelve tambien su modelo. Sin
+# enlaces simbolicos (algunos Windows) las rutas de siempre se copian como antes.
+# actual.json guarda los metadatos de la version vigente.
+
+RAIZ = "data/versiones"
+PUNTERO = "actual.json"
+ENLACE = "actual"
+CONSERVAR = 3
+
+
+def _enlazar_o_copiar(origen: str, destino: str):
+    # Los escritores siempre reemplazan archivos, nunca los modifican: un hard
+    # link es seguro y evita duplicar datos
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def reemplazar_directorio(origen: str, destino: str):
+    # Copia origen en destino.tmp y lo cambia de una vez por el directorio anterior
+    tmp = destino + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(origen, tmp, copy_function=_enlazar_o_copiar)
+    viejo = destino + ".old"
+    shutil.rmtree(viejo, ignore_errors=True)
+    if os.path.exists(destino):
+        os.replace(destino, viejo)
+    os.replace(tmp, destino)
+    shutil.rmtree(viejo, ignore_errors=True)
+
+
+def enlazar(objetivo: str, ruta: str):
+    # Crea o cambia el enlace ruta -> objetivo de una vez (os.replace sobre un
+    # enlace temporal). Una ruta que todavia es un directorio real se aparta
+    # antes: solo pasa la primera vez
+    tmp = os.path.join(os.path.dirname(ruta) or ".", f".{os.path.basename(ruta)}.{os.getpid()}.tmp")
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(objetivo, tmp)
+    try:
+        if os.path.isdir(ruta) and not os.path.islink(ruta):
+            viejo = ruta + ".old"
+            shutil.rmtree(viejo, ignore_errors=True)
+            os.replace(ruta, viejo)
+            shutil.rmtree(viejo, ignore_errors=True)
+        os.replace(tmp, ruta)
+    finally:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+
+
+def incluir(origen: str, directorio: str):
+    # Agrega un archivo o directorio ya publicado a una version en preparacion.
+    # origen suele ser un enlace a actual/: se copia lo apuntado, no el enlace
+    destino = os.path.join(directorio, os.path.basename(origen))
+    origen = os.path.realpath(origen)
+    if os.path.isdir(origen):
+        shutil.copytree(origen, destino, copy_function=_enlazar_o_copiar)
+    elif os.path.exists(origen):
+        _enlazar_o_copiar(origen, destino)
+
+
+class AlmacenVersiones:
+    def __init__(self, raiz: str = RAIZ):
+        self.raiz = raiz
+        self.ruta_puntero = os.path.join(raiz, PUNTERO)
+        self.ruta_enlace = os.path.join(raiz, ENLACE)
+
+    # === LECTURA ===
+    def actual(self) -> str | None:
+        try:
+            return os.path.basename(os.readlink(self.ruta_enlace))
+        except OSError:
+            pass
+        try:
+            with open(self.ruta_puntero, encoding="utf-8") as f:
+                return json.load(f)["version"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def directorio_actual(self) -> str | None:
+        version = self.actual()
+        return os.path.join(self.raiz, version) if version else None
+
+    def ruta(self, nombre: str) -> str | None:
+        # Ruta de un archivo en la version vigente, o None si no hay versiones
+        directorio = self.directorio_actual()
+        if directorio is None:
+            return None
+        ruta = os.path.join(directorio, nombre)
+        return ruta if os.path.exists(ruta) else None
+
+    def versiones(self) -> list:
+        if not os.path.isdir(self.raiz):
+            return []
+        return sorted(
+            n for n in os.listdir(self.raiz)
+            if os.path.isdir(os.path.join(self.raiz, n)) and not os.path.islink(os.path.join(self.raiz, n))
+            and not n.endswith(".tmp")
+        )
+
+    # === ESCRITURA ===
+    def preparar(self) -> tuple[str, str]:
+        # (id, directorio temporal); los ids ordenan cronologicamente
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        tmp = os.path.join(self.raiz, version + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        return version, tmp
+
+    def confirmar(self, version: str, meta: dict | None = None) -> str:
+        directorio = os.path.join(self.raiz, version)
+        os.replace(directorio + ".tmp", directorio)
+        self.activar(version, meta)
+        return directorio
+
+    def activar(self, version: str, meta: dict | None = None):
+        # Publica una version ya confirmada; tambien sirve para volver a una anterior
+        if version not in self.versiones():
+            raise ValueError(f"No existe la version {version} en {self.raiz}")
+        try:
+            enlazar(version, self.ruta_enlace)
+        except (OSError, NotImplementedError) as e:
+            # Sin enlaces simbolicos el puntero es solo actual.json
+            if os.path.lexists(self.ruta_enlace):
+                os.remove(self.ruta_enlace)
+            print(f"[WARN] Sin enlace simbolico para la version vigente, se usa {PUNTERO}: {e}")
+        puntero = {
+            "version": version,
+            "publicada": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **(meta or {}),
+        }
+        escribir_atomico(self.ruta_puntero, lambda tmp: _escribir_json(tmp, puntero))
+
+    def descartar(self, version: str):
+        shutil.rmtree(os.path.join(self.raiz, version + ".tmp"), ignore_errors=True)
+
+    def espejar(self, destinos: dict):
+        # destinos: {nombre en la version: ruta de siempre}. Cada ruta queda como
+        # enlace a actual/<nombre>; una vez creado no cambia y sigue al enlace
+        # actual. Sin enlaces simbolicos se copia el contenido, ruta por ruta
+        directorio = self.directorio_actual()
+        if directorio is None:
+            return
+        enlazado = os.path.islink(self.ruta_enlace)
+        for nombre, destino in destinos.items():
+            origen = os.path.join(directorio, nombre)
+            if not os.path.exists(origen):
+                continue
+            if enlazado:
+                objetivo = os.path.relpath(os.path.join(self.ruta_enlace, nombre), os.path.dirname(destino) or ".")
+                try:
+                    if os.path.islink(destino) and os.readlink(destino) == objetivo:
+                        continue
+                    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+                    enlazar(objetivo, destino)
+                    continue
+                except (OSError, NotImplementedError) as e:
+                    print(f"[WARN] No se pudo enlazar {destino}, se copia: {e}")
+            if os.path.islink(destino):
+                os.remove(destino)
+            if os.path.isdir(origen):
+                reemplazar_directorio(origen, destino)
+            else:
+                escribir_atomico(destino, lambda tmp: _enlazar_o_copiar(origen, tmp))
+
+    def podar(self, conservar: int = CONSERVAR) -> list:
+        # Borra las versiones mas viejas; la vigente nunca se borra
+        actual = self.actual()
+        sobrantes = [v for v in self.versiones()[:-conservar] if v != actual] if conservar > 0 else []
+        for version in sobrantes:
+            shutil.rmtree(os.path.join(self.raiz, version), ignore_errors=True)
+        # Restos de ciclos interrumpidos
+        if os.path.isdir(self.raiz):
+            for n in os.listdir(self.raiz):
+                if n.endswith(".tmp") and os.path.isdir(os.path.join(self.raiz, n)):
+                    shutil.rmtree(os.path.join(self.raiz, n), ignore_errors=True)
+        return sobrantes
+
+
+def _escribir_json(ruta: str, datos):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
@@ -1,129 +1,423 @@
 import os
-import sys
-import json
-import requests
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from time import sleep
+from cryptored.almacen import AlmacenCriptos, exportar_json
+from cryptored.cola import ColaExtraccion
+from cryptored.descarga import ClienteCoinGecko, ErrorDescarga
+from cryptored.graficos import RenderizadorSparklines, dibujar, nombre_archivo
+from cryptored.instrumentacion import ejecucion, tramo
+from cryptored.mercado import CAMBIOS_API, CAMPOS_PRECIO, MONEDA_BASE, MONEDAS, PUENTE, convertir, tasas
+from cryptored.series import DIAS_HISTORIAL, AlmacenSeries, dia_actual, serie_desde_market_chart
 
 DATA_PATH = "public/data/criptos_completas.json"
 CHARTS_DIR = "public/charts"
+TTL_HISTORIAL_HORAS = 24
+DIAS_GRAFICO = 7
+COLUMNAS_MONEDA = ["id", "name", "symbol", "image"]
+# Sin estos la fila se descarta; el cambio a 1 año falta en las criptos mas nuevas
+CAMPOS_MERCADO = [
+    "market_cap", "current_price",
+    "price_change_24h", "price_change_7d", "price_change_30d"
+]
 os.makedirs("public/data", exist_ok=True)
 os.makedirs(CHARTS_DIR, exist_ok=True)
 
-def get_price_history(coin_id: str, days: int = 7) -> list:
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-    params = {"vs_currency": "usd", "days": days, "interval": "daily"}
+def get_market_chart(coin_id: str, days: int = 7, cliente: ClienteCoinGecko | None = None) -> pd.DataFrame:
+    propio = cliente is None
+    cliente = cliente or ClienteCoinGecko(hilos=1)
     try:
-        r = requests.get(url, params=params)
-        if r.status_code == 200:
-            return [p[1] for p in r.json().get("prices", [])]
-    except:
-        pass
-    return []
+        return descargar_serie(coin_id, days, cliente)
+    except ErrorDescarga as e:
+        print(f"[WARN] Sin historial para {coin_id}: {e}")
+    except Exception as e:
+        print(f"[WARN] Historial invalido para {coin_id}: {e}")
+    finally:
+        if propio:
+            cliente.cerrar()
+    return serie_desde_market_chart({})
+
+def descargar_serie(coin_id: str, days: int, cliente: ClienteCoinGecko) -> pd.DataFrame:
+    # Sin capturar errores: el extractor los anota en la cola para reintentar
+    return serie_desde_market_chart(cliente.market_chart(coin_id, days))
+
+def get_price_history(coin_id: str, days: int = 7, cliente: ClienteCoinGecko | None = None) -> list:
+    return get_market_chart(coin_id, days, cliente)["price"].tolist()
+
+def dias_a_descargar(coin_id: str, ultimos: dict) -> int:
+    # Con serie guardada solo se piden los dias que faltan (minimo lo que muestra el grafico)
+    ultimo = ultimos.get(coin_id)
+    if ultimo is None:
+        return DIAS_HISTORIAL
+    return int(min(DIAS_HISTORIAL, max(DIAS_GRAFICO, dia_actual() - ultimo + 1)))
 
 def generar_mini_grafico(prices: list, symbol: str) -> str:
+    # Grafico individual; el extractor usa RenderizadorSparklines por lotes
     if not prices:
         return ""
-    path = f"{CHARTS_DIR}/{symbol}_chart.png"
     try:
-        plt.figure(figsize=(3, 1.4))
-        plt.plot(prices, color="#7f5af0", linewidth=1.5)
-        plt.xticks([])
-        plt.yticks([])
-        plt.tight_layout()
-        plt.savefig(path, transparent=True)
-        plt.close()
-        return f"/charts/{symbol}_chart.png"
-    except:
+        dibujar(prices, os.path.join(CHARTS_DIR, nombre_archivo(symbol, "png")))
+        return f"/charts/{nombre_archivo(symbol, 'png')}"
+    except Exception:
         return ""
 
 def cargar_existentes() -> dict:
-    if os.path.exists(DATA_PATH):
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return {item["symbol"]: item for item in data}
-    return {}
+    with tramo("load", origen="almacen"):
+        return {item["symbol"]: item for item in AlmacenCriptos().leer_registros()}
 
-def extraer_pagina(pagina: int):
-    existentes = cargar_existentes()
-    nuevos = 0
+def guardar(existentes: dict, cambiados: dict, exportar: bool = True):
+    # Solo las filas cambiadas van al almacen; el JSON es la vista para el frontend.
+    # cambiados es un dict (conjunto ordenado): las filas se escriben en el orden
+    # en que se procesaron (ranking por market cap), que es el que conserva el almacen
+    with tramo("export", filas=len(cambiados)):
+        AlmacenCriptos().escribir_cambios(existentes[s] for s in cambiados)
+        if exportar:
+            exportar_json(list(existentes.values()), DATA_PATH)
 
-    print(f"[INFO] Consultando pagina {pagina}")
+def tasas_cambio(cliente: ClienteCoinGecko, monedas: tuple = MONEDAS) -> dict:
+    # La cripto puente en cada moneda: una llamada por moneda y por corrida
+    extra = [m for m in monedas if m != MONEDA_BASE]
+    if not extra:
+        return {}
+    puente = {}
+    for moneda in [MONEDA_BASE] + extra:
+        try:
+            fila = cliente.mercados(1, vs_currency=moneda, ids=[PUENTE])
+        except ErrorDescarga as e:
+            print(f"[WARN] Sin cotizacion de {PUENTE} en {moneda}, se omite: {e}")
+            continue
+        if fila:
+            puente[moneda] = {CAMBIOS_API.get(k, k): v for k, v in fila[0].items()}
+    if MONEDA_BASE not in puente:
+        return {}
+    return tasas(puente)
+
+def descargar_mercado(pagina: int, cliente: ClienteCoinGecko, tasas_moneda: dict | None = None) -> pd.DataFrame | None:
+    with tramo("fetch", pagina=pagina) as t:
+        coins = cliente.mercados(pagina)
+        t["monedas"] = len(coins)
+    if not coins:
+        return None
 
-    url = "https://api.coingecko.com/api/v3/coins/markets"
-    params = {
-        "vs_currency": "usd",
-        "order": "market_cap_desc",
-        "per_page": 50,
-        "page": pagina,
-        "sparkline": False,
-        "price_change_percentage": "24h,7d,30d"
-    }
+    df = pd.DataFrame(coins).reindex(columns=COLUMNAS_MONEDA + list(CAMPOS_PRECIO) + list(CAMBIOS_API))
+    df = df.rename(columns=CAMBIOS_API).dropna(subset=COLUMNAS_MONEDA + CAMPOS_MERCADO)
+    return convertir(df, tasas_moneda or {})
 
+def historial_vencido(registro: dict, ahora: datetime, ttl_horas: float) -> bool:
+    sello = registro.get("history_updated")
+    if not sello or not registro.get("chart"):
+        return True
     try:
-        res = requests.get(url, params=params)
-        res.raise_for_status()
-        coins = res.json()
-        if not coins:
-            print("[INFO] Pagina vacia.")
-            return
-    except Exception as e:
-        print(f"[ERROR] Fallo descarga: {e}")
-        return
-
-    df = pd.DataFrame(coins)[[
-        "id", "name", "symbol", "image", "market_cap", "current_price",
-        "price_change_percentage_24h_in_currency",
-        "price_change_percentage_7d_in_currency",
-        "price_change_percentage_30d_in_currency"
-    ]].dropna()
-
-    df.rename(columns={
-        "price_change_percentage_24h_in_currency": "price_change_24h",
-        "price_change_percentage_7d_in_currency": "price_change_7d",
-        "price_change_percentage_30d_in_currency": "price_change_30d"
-    }, inplace=True)
+        return ahora - datetime.fromisoformat(sello) > timedelta(hours=ttl_horas)
+    except ValueError:
+        return True
+
+def procesar_monedas(
+    df: pd.DataFrame,
+    existentes: dict,
+    cliente: ClienteCoinGecko,
+    actualizar: bool = False,
+    ttl_horas: float = TTL_HISTORIAL_HORAS,
+    cambiados: dict | None = None,
+    ultimos: dict | None = None,
+    renderizador: RenderizadorSparklines | None = None,
+    cola: ColaExtraccion | None = None
+) -> tuple[int, int, int]:
+    df = df.drop_duplicates("symbol")
+    if not actualizar:
+        df = df[~df["symbol"].isin(existentes)]
 
+    ahora = datetime.now(timezone.utc)
+    sello = ahora.isoformat(timespec="seconds")
+    nuevos = actualizados = 0
+    pendientes = {}
+
+    # Los campos de mercado vienen de /coins/markets y se refrescan siempre
+    # (los faltantes, como el cambio a 1 año, quedan en None)
+    campos = [c for c in df.columns if c not in COLUMNAS_MONEDA]
+    df = df[COLUMNAS_MONEDA].join(df[campos].astype(object).where(df[campos].notna(), None))
     for _, row in df.iterrows():
         symbol = row["symbol"]
+        registro = existentes.get(symbol)
+        if registro is None:
+            registro = {
+                "id": row["id"],
+                "name": row["name"],
+                "symbol": symbol,
+                "image": row["image"],
+                **{campo: row[campo] for campo in campos},
+                "chart": "",
+                "predicted": False,
+                "reason": ""
+            }
+            nuevos += 1
+        else:
+            actualizados += 1
+
+        registro.update({campo: row[campo] for campo in campos})
+        registro["last_updated"] = sello
+        existentes[symbol] = registro
+        if cambiados is not None:
+            cambiados[symbol] = None
+
+        if historial_vencido(registro, ahora, ttl_horas):
+            pendientes[row["id"]] = registro
+
+    # Al retomar una corrida no se repiten los historiales ya confirmados
+    if cola is not None and pendientes:
+        for coin_id in cola.resueltas(list(pendientes)):
+            del pendientes[coin_id]
+
+    descargar_historiales(pendientes, cliente, sello, ultimos, renderizador, cola)
+    return nuevos, actualizados, len(pendientes)
+
+def descargar_historiales(
+    pendientes: dict,
+    cliente: ClienteCoinGecko,
+    sello: str,
+    ultimos: dict | None = None,
+    renderizador: RenderizadorSparklines | None = None,
+    cola: ColaExtraccion | None = None
+):
+    # pendientes: {coin_id: registro}. Solo los historiales vencidos se descargan,
+    # en paralelo; los graficos se dibujan por lotes en el pool de procesos
+    # mientras sigue la extraccion. Los fallos quedan en la cola con su intento
+    ultimos = {} if ultimos is None else ultimos
+    series = {}
+    trabajos = []
+    with tramo("history", monedas=len(pendientes)) as t:
+        for coin_id, serie, error in cliente.mapear(
+            lambda coin_id: descargar_serie(coin_id, dias_a_descargar(coin_id, ultimos), cliente),
+            list(pendientes)
+        ):
+            symbol = pendientes[coin_id]["symbol"]
+            if error is not None:
+                print(f"[WARN] Sin historial para {coin_id}: {error}")
+                if cola is not None:
+                    cola.marcar_fallo(coin_id, symbol, str(error))
+                continue
+            if cola is not None:
+                cola.marcar_hecha(coin_id, symbol)
+            if len(serie):
+                series[coin_id] = serie
+                trabajos.append((symbol, serie["price"].tail(DIAS_GRAFICO + 1).to_numpy()))
+        t["series"] = len(series)
+        t["fallidas"] = len(pendientes) - len(series)
+
+    propio = renderizador is None
+    renderizador = renderizador or RenderizadorSparklines(CHARTS_DIR, procesos=1)
+    with tramo("chart", graficos=len(trabajos)):
+        urls = renderizador.enviar(trabajos)
+        if propio:
+            fallidos = renderizador.esperar()
+            urls = {s: u for s, u in urls.items() if s not in fallidos}
+    for coin_id, registro in pendientes.items():
+        if registro["symbol"] in urls:
+            registro["chart"] = urls[registro["symbol"]]
+            registro["history_updated"] = sello
+
+    # La serie completa se conserva para features; no solo el grafico
+    if series:
+        AlmacenSeries().agregar(series)
+        ultimos.update({coin_id: int(serie["dia"].max()) for coin_id, serie in series.items()})
+
+def confirmar_lote(
+    existentes: dict, cambiados: dict, renderizador: RenderizadorSparklines, cola: ColaExtraccion, pagina=None
+) -> int:
+    # Punto de control: graficos terminados -> filas al almacen -> cola. Si el
+    # proceso se corta antes de confirmar la cola, al retomar solo se repite este lote
+    with tramo("chart", espera=True):
+        fallidos = renderizador.esperar()
+    for symbol in fallidos:
         if symbol in existentes:
-            continue
+            existentes[symbol]["chart"] = ""
+            existentes[symbol].pop("history_updated", None)
+    guardadas = len(cambiados)
+    if cambiados:
+        guardar(existentes, cambiados, exportar=False)
+        cambiados.clear()
+    cola.confirmar(pagina)
+    return guardadas
 
-        prices = get_price_history(row["id"])
-        chart_path = generar_mini_grafico(prices, symbol)
-
-        existentes[symbol] = {
-            "id": row["id"],
-            "name": row["name"],
-            "symbol": symbol,
-            "image": row["image"],
-            "market_cap": row["market_cap"],
-            "current_price": row["current_price"],
-            "price_change_24h": row["price_change_24h"],
-            "price_change_7d": row["price_change_7d"],
-            "price_change_30d": row["price_change_30d"],
-            "chart": chart_path,
-            "predicted": False,
-            "reason": ""
-        }
-
-        nuevos += 1
-
-    if nuevos > 0:
-        with open(DATA_PATH, "w", encoding="utf-8") as f:
-            json.dump(list(existentes.values()), f, indent=2, ensure_ascii=False)
-        print(f"[OK] Criptos nuevas: {nuevos}")
-    else:
-        print("[INFO] No se agregaron criptos nuevas.")
+def reintentar_pendientes(
+    existentes: dict,
+    cliente: ClienteCoinGecko,
+    cola: ColaExtraccion,
+    ultimos: dict,
+    renderizador: RenderizadorSparklines,
+    cambiados: dict
+) -> int:
+    # Los historiales que fallaron y aun tienen intentos se vuelven a pedir al final
+    guardadas = 0
+    for _ in range(cola.max_intentos):
+        pendientes = {c: existentes[s] for c, s in cola.pendientes().items() if s in existentes}
+        if not pendientes:
+            break
+        print(f"[INFO] Reintentando {len(pendientes)} historiales fallidos")
+        sello = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        descargar_historiales(pendientes, cliente, sello, ultimos, renderizador, cola)
+        cambiados.update(dict.fromkeys(registro["symbol"] for registro in pendientes.values()))
+        guardadas += confirmar_lote(existentes, cambiados, renderizador, cola)
+    return guardadas
 
-if __name__ == "__main__":
+def extraer_paginas(
+    desde: int,
+    hasta: int | None = None,
+    cliente: ClienteCoinGecko | None = None,
+    actualizar: bool = False,
+    ttl_horas: float = TTL_HISTORIAL_HORAS,
+    formato_grafico: str = "png",
+    reanudable: bool = True,
+    reiniciar: bool = False,
+    monedas: tuple = MONEDAS,
+    exportar: bool = True
+) -> int:
+    # hasta=None recorre paginas hasta encontrar una vacia. Con reanudable cada
+    # pagina se confirma al terminarla (ver cryptored/cola.py) y una corrida
+    # interrumpida con los mismos parametros sigue donde quedo. exportar=False
+    # solo escribe el almacen: el programador publica el JSON en su version
+    if cliente is None:
+        with ClienteCoinGecko() as cliente:
+            return extraer_paginas(
+                desde, hasta, cliente, actualizar, ttl_horas, formato_grafico, reanudable, reiniciar, monedas,
+                exportar
+            )
+
+    cola = ColaExtraccion() if reanudable else None
+    if cola is not None and cola.iniciar(
+        {"desde": desde, "hasta": hasta, "actualizar": actualizar, "monedas": list(monedas)}, reiniciar
+    ):
+        e = cola.estadisticas()
+        print(f"[INFO] Reanudando extraccion: {e['paginas']} paginas y {e['hecha']} historiales ya confirmados")
+
+    def proxima(pagina: int) -> int | None:
+        while cola is not None and (hasta is None or pagina <= hasta) and cola.pagina_hecha(pagina):
+            pagina += 1
+        return pagina if hasta is None or pagina <= hasta else None
+
+    existentes = cargar_existentes()
+    ultimos = AlmacenSeries().ultimo_dia()
+    cambiados = {}
+    nuevos = actualizados = guardadas = 0
+    inicio = time.perf_counter()
+    total = f"/{hasta}" if hasta is not None and hasta != desde else ""
+
+    renderizador = RenderizadorSparklines(CHARTS_DIR, formato=formato_grafico)
+    tasas_moneda = tasas_cambio(cliente, monedas)
+    pagina = proxima(desde)
+    siguiente = cliente.pool.submit(descargar_mercado, pagina, cliente, tasas_moneda) if pagina is not None else None
     try:
-        if len(sys.argv) > 1:
-            pagina = int(sys.argv[1])
-            extraer_pagina(pagina)
+        completa = False
+        while siguiente is not None:
+            print(f"[INFO] Consultando pagina {pagina}{total}")
+            try:
+                df = siguiente.result()
+            except Exception as e:
+                print(f"[ERROR] Fallo descarga: {e}")
+                break
+            if df is None:
+                print("[INFO] Pagina vacia.")
+                completa = True
+                break
+
+            # La pagina siguiente se descarga mientras se procesan los historiales de esta
+            posterior = proxima(pagina + 1)
+            siguiente = (
+                cliente.pool.submit(descargar_mercado, posterior, cliente, tasas_moneda) if posterior is not None else None
+            )
+
+            n, a, h = procesar_monedas(
+                df, existentes, cliente, actualizar, ttl_horas, cambiados, ultimos, renderizador, cola
+            )
+            if cola is not None:
+                guardadas += confirmar_lote(existentes, cambiados, renderizador, cola, pagina)
+            nuevos += n
+            actualizados += a
+            print(
+                f"[PROGRESO] Pagina {pagina}{total}: +{n} nuevas, {a} actualizadas, "
+                f"{h} historiales descargados, {len(existentes)} en total, "
+                f"{time.perf_counter() - inicio:.1f}s",
+                flush=True
+            )
+            pagina = posterior
+        else:
+            completa = True
+
+        if completa and cola is not None:
+            guardadas += reintentar_pendientes(existentes, cliente, cola, ultimos, renderizador, cambiados)
+            e = cola.estadisticas()
+            if e["fallida"]:
+                print(f"[WARN] {e['fallida']} historiales sin descargar tras {cola.max_intentos} intentos")
+            cola.terminar()
+    finally:
+        # Los graficos que fallaron no se publican y se reintentan en la proxima corrida
+        with tramo("chart", espera=True):
+            fallidos = renderizador.esperar()
+        for symbol in fallidos:
+            if symbol in existentes:
+                existentes[symbol]["chart"] = ""
+                existentes[symbol].pop("history_updated", None)
+        renderizador.cerrar()
+        if cola is not None:
+            cola.cerrar()
+        print(f"[INFO] Graficos dibujados: {renderizador.dibujados}, sin cambios: {renderizador.omitidos}")
+        if cliente.cache is not None:
+            e = cliente.cache.estadisticas()
+            print(
+                f"[INFO] Cache HTTP: {e['aciertos']} desde cache, {e['revalidadas']} revalidadas (304), "
+                f"{e['descargas']} descargadas"
+            )
+        if cambiados or guardadas:
+            guardar(existentes, cambiados, exportar)
+            print(f"[OK] Criptos nuevas: {nuevos}")
+            if actualizar:
+                print(f"[OK] Criptos actualizadas: {actualizados}")
         else:
-            print("[ERROR] Debes indicar una pagina")
+            print("[INFO] No se agregaron criptos nuevas.")
+    return nuevos
+
+def extraer_pagina(pagina: int, cliente: ClienteCoinGecko | None = None, actualizar: bool = False) -> int:
+    return extraer_paginas(pagina, pagina, cliente, actualizar)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrae criptos de CoinGecko por paginas de 50")
+    parser.add_argument("pagina", type=int, help="Primera pagina a consultar")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--hasta", type=int, help="Ultima pagina a consultar (incluida)")
+    grupo.add_argument("--hasta-vacia", action="store_true", help="Continua hasta encontrar una pagina vacia")
+    parser.add_argument(
+        "--actualizar", action="store_true",
+        help="Refresca precios y variaciones de las criptos ya guardadas en lugar de omitirlas"
+    )
+    parser.add_argument(
+        "--ttl-historial", type=float, default=TTL_HISTORIAL_HORAS,
+        help=f"Horas antes de volver a descargar el historial de una cripto (por defecto {TTL_HISTORIAL_HORAS})"
+    )
+    parser.add_argument(
+        "--reiniciar", action="store_true",
+        help="Ignora una extraccion anterior sin terminar y empieza de cero"
+    )
+    parser.add_argument(
+        "--monedas", default=",".join(MONEDAS),
+        help=f"Monedas de cotizacion separadas por coma; {MONEDA_BASE} siempre se incluye (por defecto {','.join(MONEDAS)})"
+    )
+    parser.add_argument(
+        "--formato-grafico", choices=["png", "svg"], default="png",
+        help="Formato de los mini graficos (svg se escribe sin matplotlib)"
+    )
+    args = parser.parse_args()
+
+    try:
+        hasta = None if args.hasta_vacia else (args.hasta or args.pagina)
+        if hasta is not None and hasta < args.pagina:
+            raise ValueError("--hasta debe ser mayor o igual que la pagina inicial")
+        with ejecucion("extractor", pagina=args.pagina, hasta=hasta, actualizar=args.actualizar):
+            extraer_paginas(
+                args.pagina, hasta, actualizar=args.actualizar, ttl_horas=args.ttl_historial,
+                formato_grafico=args.formato_grafico, reiniciar=args.reiniciar,
+                monedas=tuple(m.strip().lower() for m in args.monedas.split(",") if m.strip())
+            )
     except Exception as e:
         print(f"[ERROR] Argumento invalido: {e}")
@@ -1,18 +1,32 @@
+import math
 import os
 import json
 import pandas as pd
 import numpy as np
 import sys
 
+from cryptored.almacen import AlmacenCriptos
+from cryptored.cache import CacheLRU
+from cryptored.instrumentacion import ejecucion, tramo
+from cryptored.mercado import MONEDA_BASE, columna
+from cryptored.optimizador import METODO_POR_RIESGO, optimizar
+from cryptored.recomendacion import OUTPUT_JSON
+from cryptored.riesgo import columna_score, filtro_riesgo
+from cryptored.series import AlmacenSeries
+from cryptored.simulacion import CAMINOS, SEMILLA, escalar_simulacion, simular_portafolio
+
 # === RUTAS ===
-INPUT_JSON = "criptos_predichas.json"
+# Relativas al directorio de trabajo, como todas las del repo: los scripts se
+# corren desde la raiz (python scripts/modelo_portafolio.py), igual que el
+# almacen de series que usan la simulacion y el optimizador
+INPUT_JSON = OUTPUT_JSON
 
 # === CARGAR DATOS ===
-def cargar_criptos():
-    if not os.path.exists(INPUT_JSON):
-        raise FileNotFoundError(f"No se encontró el archivo: {INPUT_JSON}")
+def cargar_criptos(ruta: str = INPUT_JSON):
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
     
-    with open(INPUT_JSON, encoding="utf-8") as f:
+    with open(ruta, encoding="utf-8") as f:
         data = json.load(f)
     
     df = pd.DataFrame(data)
@@ -26,128 +40,354 @@ def cargar_criptos():
     df = df[df["current_price"] > 0]
     df = df[df["score"] > 0]
 
+    df = _completar_ids(df)
+    df.attrs["version"] = version_datos(ruta)
+    return df
+
+def _completar_ids(df: pd.DataFrame) -> pd.DataFrame:
+    # Los JSON anteriores no traen el id de CoinGecko; se resuelve por símbolo
+    # desde el almacén para poder cruzar con las series guardadas
+    if "id" in df and df["id"].notna().all():
+        return df
+    try:
+        mapa = AlmacenCriptos().leer(["symbol", "id"])
+    except Exception as e:
+        print(f"[WARN] No se pudieron resolver los ids desde el almacen: {e}", file=sys.stderr)
+        return df
+    if mapa.empty or "id" not in mapa:
+        print("[WARN] El almacen de criptos esta vacio: no se resuelven los ids", file=sys.stderr)
+        return df
+    por_simbolo = dict(zip(mapa["symbol"].str.lower(), mapa["id"]))
+    ids = df["symbol"].str.lower().map(por_simbolo)
+    df = df.copy()
+    df["id"] = df["id"].fillna(ids) if "id" in df else ids
     return df
 
+# === CACHE DE PORTAFOLIOS ===
+# La seleccion, los pesos y las curvas de crecimiento no dependen del capital:
+# se cachean por (version de datos, riesgo, plazo, top_n) y el capital solo
+# escala el resultado. La version cambia con cada reescritura del JSON.
+CACHE_PORTAFOLIOS = CacheLRU(max_entradas=256, ttl=300)
+
+def version_datos(ruta: str) -> str:
+    st = os.stat(ruta)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+def estadisticas_cache() -> dict:
+    return CACHE_PORTAFOLIOS.estadisticas()
+
+# === PARAMETROS DE PROYECCION ===
+# Limite del cambio mensual usado en la proyeccion según riesgo:
+# leve +/-5% (conservador), moderado +/-15%, volatil +/-40%
+LIMITE_CAMBIO = {"leve": 0.05, "moderado": 0.15, "volatil": 0.4}
+
+# plazo -> (columna de variación, puntos de la curva, exponente de cada punto en días,
+# meses que cubre la variación). Cada plazo usa su variación ya calculada por el
+# extractor; en otra moneda, la columna con el sufijo de esa moneda
+HORIZONTES = {
+    "24h": ("price_change_24h", 24, lambda x: x / 24, 1),
+    "30d": ("price_change_30d", 30, lambda x: x, 1),
+    "1a": ("price_change_1y", 12, lambda x: x * 30, 365 / 30),
+}
+# Datos sin el cambio a 1 año (publicados antes de extraerlo): se extrapola el mensual
+HORIZONTE_1A_SIN_DATOS = ("price_change_30d", 12, lambda x: x * 30, 1)
+
+# Pesos: "score" reparte proporcional al score del modelo; el resto usa el
+# optimizador (por defecto el método asignado a cada riesgo en METODO_POR_RIESGO)
+METODOS = ("score",) + tuple(dict.fromkeys(METODO_POR_RIESGO.values()))
+CANDIDATOS_POR_PUESTO = 3
+MAX_CANDIDATOS = 500
+
 # === RECOMENDADOR PRINCIPAL ===
-def recomendar_portafolio(capital: float, riesgo: str, plazo: str, top_n: int = 5):
-    if capital < 10:
-        raise ValueError("El capital mínimo debe ser al menos $10")
+def _pesos(candidatos: pd.DataFrame, riesgo: str, top_n: int, metodo: str | None, col_score: str = "score"):
+    # Optimiza sobre un grupo amplio de candidatos (por score) usando la
+    # covarianza de las series guardadas y se queda con los top_n de mayor peso.
+    # Sin historial suficiente: error si el método se pidió explícitamente, si
+    # no se avisa (por stderr, stdout es el JSON) y se usan pesos por score
+    if metodo != "score":
+        pesos = None
+        if "id" in candidatos:
+            grupo = candidatos.head(min(MAX_CANDIDATOS, top_n * CANDIDATOS_POR_PUESTO)).dropna(subset=["id"])
+            pesos = optimizar(grupo["id"].tolist(), riesgo, metodo) if len(grupo) else None
+        if pesos:
+            w = grupo["id"].map(pesos).fillna(0).to_numpy(dtype=float)
+            orden = np.argsort(-w, kind="stable")[:top_n]
+            orden = orden[w[orden] > 1e-6]
+            if len(orden):
+                return grupo.iloc[orden], w[orden] / w[orden].sum()
+        motivo = (
+            f"sin historial de retornos en {AlmacenSeries().directorio} para las candidatas"
+            if "id" in candidatos else "las criptos publicadas no tienen id de CoinGecko"
+        )
+        if metodo is not None:
+            raise ValueError(f"No se puede optimizar con '{metodo}': {motivo}")
+        print(f"[WARN] Pesos proporcionales al score, no optimizados: {motivo}", file=sys.stderr)
 
-    df = cargar_criptos()
-
-    # === FILTROS DIFERENCIADOS ===
-    if riesgo == "leve":
-        if plazo == "1a":
-            # Menos estricto: permite price_change_30d hasta 35 y score > 0.35
-            filtro = (df["price_change_30d"] > 0) & (df["price_change_30d"] < 35) & (df["score"] > 0.35)
-        else:
-            # Menos estricto: permite price_change_30d hasta 25 y score > 0.4
-            filtro = (df["price_change_30d"] > 0) & (df["price_change_30d"] < 25) & (df["score"] > 0.4)
-    elif riesgo == "moderado":
-        # Más intermedio: price_change_30d > -15 y < 40, score > 0.3
-        filtro = (df["price_change_30d"] > -15) & (df["price_change_30d"] < 40) & (df["score"] > 0.3)
-    elif riesgo == "volatil":
-        filtro = (df["price_change_30d"] > -30) & (df["price_change_30d"] < 60) & (df["score"] > 0.2)
-    else:
-        raise ValueError("Riesgo inválido: leve, moderado o volatil")
-
-    if plazo == "24h":
-        col = "price_change_24h"
-        puntos = 24
-        escala = "horas"
-    elif plazo == "30d":
-        col = "price_change_30d"
-        puntos = 30
-        escala = "días"
-    elif plazo == "1a":
-        col = "price_change_30d"
-        puntos = 12
-        escala = "meses"
-    else:
+    candidatos = candidatos.head(top_n)
+    score = candidatos[col_score].to_numpy(dtype=float)
+    total_score = float(score.sum())
+    return candidatos, (score / total_score if total_score > 0 else np.zeros_like(score))
+
+def horizonte(df: pd.DataFrame, plazo: str, moneda: str = MONEDA_BASE) -> tuple:
+    # HORIZONTES[plazo] con la columna de la moneda pedida
+    if plazo not in HORIZONTES:
         raise ValueError("Plazo inválido: 24h, 30d o 1a")
+    col, puntos, exponente, meses = HORIZONTES[plazo]
+    if plazo == "1a" and col not in df.columns:
+        col, puntos, exponente, meses = HORIZONTE_1A_SIN_DATOS
+    col = columna(col, moneda)
+    if col not in df.columns or columna("current_price", moneda) not in df.columns:
+        raise ValueError(f"Moneda no disponible: {moneda}")
+    return col, puntos, exponente, meses
+
+def _portafolio_base(
+    df: pd.DataFrame, riesgo: str, plazo: str, top_n: int, metodo: str | None = None, moneda: str = MONEDA_BASE
+) -> dict | None:
+    # Parte del portafolio que no depende del capital: seleccion, pesos y la
+    # matriz de crecimiento (criptos x puntos) calculada por broadcasting. La
+    # seleccion usa el score del plazo; la moneda solo cambia precios y variaciones
+    filtro = filtro_riesgo(df, riesgo, plazo)
+    col, puntos, exponente, meses = horizonte(df, plazo, moneda)
+    if metodo is not None and metodo not in METODOS:
+        raise ValueError(f"Método inválido: {', '.join(METODOS)}")
+    col_score = columna_score(df, plazo)
 
     candidatos = df[filtro]
-    if not isinstance(candidatos, pd.DataFrame):
-        candidatos = pd.DataFrame(candidatos)
-    candidatos = candidatos.copy()
+    candidatos = candidatos[np.isfinite(candidatos[col].to_numpy(dtype=float))]
     if candidatos.shape[0] == 0:
-        print(json.dumps([]))
-        return
+        return None
+
+    candidatos = candidatos.sort_values(col_score, ascending=False)
+    candidatos, peso = _pesos(candidatos, riesgo, top_n, metodo, col_score)
+    score = candidatos[col_score].to_numpy(dtype=float)
+
+    # === AJUSTE DE PROYECCIÓN SEGÚN RIESGO ===
+    # El límite es mensual: una variación de varios meses se lleva a su equivalente mensual
+    limite = LIMITE_CAMBIO[riesgo]
+    mensual = (1 + candidatos[col].to_numpy(dtype=float) / 100) ** (1 / meses) - 1
+    cambio = np.clip(mensual, -limite, limite)
+    factor_diario = (1 + cambio) ** (1 / 30)
+    x = np.arange(puntos + 1)
+    crecimiento = factor_diario[:, None] ** exponente(x)[None, :]
+
+    return {
+        "id": candidatos["id"].tolist() if "id" in candidatos else [None] * len(candidatos),
+        "image": candidatos["image"].tolist() if "image" in candidatos else [""] * len(candidatos),
+        "nombre": candidatos["name"].tolist(),
+        "symbol": candidatos["symbol"].astype(str).str.upper().tolist(),
+        "reason": candidatos["reason"].tolist() if "reason" in candidatos else [""] * len(candidatos),
+        "precio": candidatos[columna("current_price", moneda)].to_numpy(dtype=float),
+        "moneda": moneda,
+        "score": score,
+        "peso": peso,
+        "crecimiento": crecimiento,
+    }
+
+def _base_cacheada(
+    df: pd.DataFrame, riesgo: str, plazo: str, top_n: int, metodo: str | None = None, moneda: str = MONEDA_BASE
+) -> dict | None:
+    version = df.attrs.get("version")
+    if version is None:
+        return _portafolio_base(df, riesgo, plazo, top_n, metodo, moneda)
+    # Los pesos optimizados dependen tambien de las series guardadas
+    version_series = AlmacenSeries().version() if metodo != "score" else None
+    clave = (version, version_series, riesgo, plazo, top_n, metodo, moneda)
+    return CACHE_PORTAFOLIOS.obtener_o_calcular(
+        clave, lambda: _portafolio_base(df, riesgo, plazo, top_n, metodo, moneda)
+    )
 
-    candidatos = candidatos.sort_values("score", ascending=False).head(top_n)
-    total_score = float(candidatos["score"].sum())
-    candidatos["peso"] = candidatos["score"] / total_score if total_score > 0 else 0
-    candidatos["monto_invertido"] = candidatos["peso"] * capital
+def _escalar(base: dict | None, capitales: np.ndarray, plazo: str) -> list:
+    # Escala la base a varios capitales a la vez: montos (criptos x capitales) y
+    # proyecciones (capitales x criptos x puntos); se redondea una sola vez
+    if base is None:
+        return [[] for _ in capitales]
+    monto = base["peso"][:, None] * capitales[None, :]
+    unidades = monto / base["precio"][:, None]
+    valor = np.round(unidades * base["precio"][:, None], 2).T.tolist()
+    unidades = np.round(unidades, 6).T.tolist()
+    proyeccion = np.round(base["crecimiento"][None, :, :] * monto.T[:, :, None], 2).tolist()
 
-    resumen = []
-    x_range = list(range(puntos + 1))
+    precio = np.round(base["precio"], 4).tolist()
+    score = np.round(base["score"], 3).tolist()
+    probabilidad = [f"{p}%" for p in np.round(base["score"] * 100, 1).tolist()]
 
-    for _, row in candidatos.iterrows():
+    resultados = []
+    for k in range(len(capitales)):
+        resultados.append([
+            {
+                "image": base["image"][i],
+                "nombre": base["nombre"][i],
+                "symbol": base["symbol"][i],
+                "precio_actual": precio[i],
+                "unidades": unidades[k][i],
+                f"valor_{base['moneda']}": valor[k][i],
+                "score": score[i],
+                "reason": base["reason"][i],
+                "plazo": plazo,
+                "probabilidad_subida": probabilidad[i],
+                "proyeccion": proyeccion[k][i]
+            }
+            for i in range(len(precio))
+        ])
+    return resultados
+
+def calcular_portafolio(
+    df: pd.DataFrame, capital: float, riesgo: str, plazo: str, top_n: int = 5, metodo: str | None = None,
+    moneda: str = MONEDA_BASE
+) -> list:
+    # capital y resultados en la moneda pedida (valor_<moneda> en cada cripto)
+    validar_parametros(capital, top_n)
+    base = _base_cacheada(df, riesgo, plazo, top_n, metodo, moneda)
+    return _escalar(base, np.array([float(capital)]), plazo)[0]
+
+def validar_parametros(capital: float, top_n: int):
+    # NaN/inf no son JSON valido en la respuesta y head(top_n <= 0) no es un top
+    if not math.isfinite(capital):
+        raise ValueError("El capital debe ser un número finito")
+    if capital < 10:
+        raise ValueError("El capital mínimo debe ser al menos $10")
+    if top_n < 1:
+        raise ValueError("top_n debe ser al menos 1")
+
+def validar_escenarios(escenarios) -> list:
+    # Forma del lote antes de calcular: lista de objetos con capital numérico
+    # finito, top_n entero positivo y riesgo/plazo de texto. El capital mínimo y
+    # los riesgos/plazos desconocidos se informan por escenario
+    if not isinstance(escenarios, list):
+        raise ValueError("Se espera una lista de escenarios")
+    for i, esc in enumerate(escenarios):
+        if not isinstance(esc, dict):
+            raise ValueError(f"Escenario {i}: se espera un objeto con capital, riesgo y plazo")
+        faltan = [p for p in ("capital", "riesgo", "plazo") if p not in esc]
+        if faltan:
+            raise ValueError(f"Escenario {i}: faltan parámetros requeridos: {', '.join(faltan)}")
+        if isinstance(esc["capital"], bool) or not isinstance(esc["capital"], (int, float)):
+            raise ValueError(f"Escenario {i}: capital debe ser numérico")
+        if not math.isfinite(esc["capital"]):
+            # json.loads acepta NaN e Infinity
+            raise ValueError(f"Escenario {i}: capital debe ser un número finito")
+        top_n = esc.get("top_n", 5)
+        if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+            raise ValueError(f"Escenario {i}: top_n debe ser un entero de al menos 1")
+        if not isinstance(esc["riesgo"], str) or not isinstance(esc["plazo"], str):
+            raise ValueError(f"Escenario {i}: riesgo y plazo deben ser texto")
+    return escenarios
+
+def calcular_escenarios(df: pd.DataFrame, escenarios: list) -> list:
+    # Modo lote: muchos (capital, riesgo, plazo, top_n[, moneda]) en una llamada. Los
+    # escenarios que comparten riesgo/plazo/top_n/moneda comparten base y se escalan juntos
+    resultados = [None] * len(escenarios)
+    grupos = {}
+    for i, esc in enumerate(escenarios):
         try:
-            monto = float(row["monto_invertido"])
-            precio = float(row["current_price"])
-            unidades = monto / precio
-            cambio_pct = float(row[col]) / 100
-
-            # === AJUSTE DE PROYECCIÓN SEGÚN RIESGO ===
-            if riesgo == "leve":
-                # Limita el crecimiento anual a +/-5% para conservador
-                cambio_pct_limitado = max(min(cambio_pct, 0.05), -0.05)
-            elif riesgo == "moderado":
-                # Limita el crecimiento anual a +/-15%
-                cambio_pct_limitado = max(min(cambio_pct, 0.15), -0.15)
-            elif riesgo == "volatil":
-                # Permite hasta +/-40%
-                cambio_pct_limitado = max(min(cambio_pct, 0.4), -0.4)
-            else:
-                cambio_pct_limitado = cambio_pct
-
-            rendimiento_diario = (1 + cambio_pct_limitado) ** (1 / 30) - 1
-            rendimiento_anual = (1 + rendimiento_diario) ** 365 - 1
-
-            if escala == "horas":
-                crecimiento = [(1 + rendimiento_diario) ** (h / 24) for h in x_range]
-            elif escala == "días":
-                crecimiento = [(1 + rendimiento_diario) ** d for d in x_range]
-            elif escala == "meses":
-                factor_30d = 1 + cambio_pct_limitado
-                factor_diario = factor_30d ** (1/30)
-                crecimiento = [(factor_diario ** (m * 30)) for m in x_range]
-            else:
-                crecimiento = [1] * len(x_range)
+            capital, top_n = float(esc["capital"]), int(esc.get("top_n", 5))
+            validar_parametros(capital, top_n)
+            clave = (
+                str(esc["riesgo"]).lower(), str(esc["plazo"]).lower(), top_n, esc.get("metodo"),
+                str(esc.get("moneda", MONEDA_BASE)).lower()
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            resultados[i] = {"error": str(e)}
+            continue
+        grupos.setdefault(clave, []).append((i, capital))
 
-            proyeccion = [round(float(c) * monto, 2) for c in crecimiento]
-        except Exception:
+    for (riesgo, plazo, top_n, metodo, moneda), miembros in grupos.items():
+        try:
+            base = _base_cacheada(df, riesgo, plazo, top_n, metodo, moneda)
+        except ValueError as e:
+            for i, _ in miembros:
+                resultados[i] = {"error": str(e)}
             continue
+        capitales = np.array([c for _, c in miembros])
+        for (i, _), resumen in zip(miembros, _escalar(base, capitales, plazo)):
+            resultados[i] = {"recomendaciones": resumen}
+    return resultados
 
-        resumen.append({
-            "image": row.get("image", ""),
-            "nombre": row["name"],
-            "symbol": str(row["symbol"]).upper(),
-            "precio_actual": round(float(precio), 4),
-            "unidades": round(float(unidades), 6),
-            "valor_usd": round(float(unidades) * float(precio), 2),
-            "score": round(float(row["score"]), 3),
-            "reason": row.get("reason", ""),
-            "plazo": plazo,
-            "probabilidad_subida": f"{round(float(row['score']) * 100, 1)}%",
-            "proyeccion": proyeccion
-        })
-
-    print(json.dumps(resumen, ensure_ascii=False))
+# === SIMULACIÓN MONTE CARLO ===
+def simular_recomendacion(
+    df: pd.DataFrame, capital: float, riesgo: str, plazo: str, top_n: int = 5,
+    metodo: str | None = None, caminos: int = CAMINOS, semilla: int = SEMILLA
+) -> dict | None:
+    # Bandas p5/p50/p95 y VaR/CVaR del portafolio recomendado, remuestreando
+    # los retornos diarios guardados. Se simula con capital 1 y se cachea igual que la base
+    validar_parametros(capital, top_n)
+    base = _base_cacheada(df, riesgo, plazo, top_n, metodo)
+    if base is None:
+        return None
+
+    def calcular():
+        ids = base["id"]
+        validos = [k for k, i in enumerate(ids) if isinstance(i, str) and i]
+        sim = None
+        if validos:
+            dias = HORIZONTES[plazo][2](np.arange(HORIZONTES[plazo][1] + 1))
+            sim = simular_portafolio([ids[k] for k in validos], base["peso"][validos], dias, caminos, semilla)
+        if sim is None:
+            # Sin series no hay nada que remuestrear: se informa en vez de devolver null
+            raise ValueError(
+                f"Sin historial de retornos para simular en {AlmacenSeries().directorio}; "
+                "ejecuta el extractor desde la raiz del repo"
+            )
+        return sim
+
+    clave = (
+        "simulacion", df.attrs.get("version"), AlmacenSeries().version(), riesgo, plazo, top_n, metodo, caminos, semilla
+    )
+    sim = calcular() if clave[1] is None else CACHE_PORTAFOLIOS.obtener_o_calcular(clave, calcular)
+    return escalar_simulacion(sim, capital)
+
+def recomendar_portafolio(
+    capital: float, riesgo: str, plazo: str, top_n: int = 5, simular: bool = False, moneda: str = MONEDA_BASE
+):
+    # La simulación remuestrea las series guardadas (en la moneda base)
+    with tramo("load", origen="predichas"):
+        df = cargar_criptos()
+    with tramo("portafolio", riesgo=riesgo, plazo=plazo, moneda=moneda):
+        resumen = calcular_portafolio(df, capital, riesgo, plazo, top_n, moneda=moneda)
+    if simular:
+        with tramo("simulacion", riesgo=riesgo, plazo=plazo):
+            simulacion = simular_recomendacion(df, capital, riesgo, plazo, top_n)
+        print(json.dumps({"recomendaciones": resumen, "simulacion": simulacion}, ensure_ascii=False))
+    else:
+        print(json.dumps(resumen, ensure_ascii=False))
+
+def recomendar_escenarios(escenarios: list):
+    validar_escenarios(escenarios)
+    with tramo("load", origen="predichas"):
+        df = cargar_criptos()
+    with tramo("portafolio", escenarios=len(escenarios)):
+        resultados = calcular_escenarios(df, escenarios)
+    print(json.dumps(resultados, ensure_ascii=False))
 
 # === EJECUCIÓN DESDE TERMINAL ===
 if __name__ == "__main__":
-    if len(sys.argv) in (4, 5):
+    if len(sys.argv) == 3 and sys.argv[1] == "--lote":
+        # Escenarios en un JSON: [{"capital": 1000, "riesgo": "leve", "plazo": "30d", "top_n": 5, "moneda": "eur"}, ...]
+        try:
+            if sys.argv[2] == "-":
+                escenarios = json.load(sys.stdin)
+            else:
+                with open(sys.argv[2], encoding="utf-8") as f:
+                    escenarios = json.load(f)
+            with ejecucion("modelo_portafolio", escenarios=len(escenarios)):
+                recomendar_escenarios(escenarios)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            print("Uso: python modelo_portafolio.py --lote <escenarios.json|->")
+    elif len(sys.argv) in (4, 5, 6, 7):
         try:
-            capital = float(sys.argv[1])
-            riesgo = sys.argv[2].lower()
-            plazo = sys.argv[3].lower()
-            top_n = int(sys.argv[4]) if len(sys.argv) == 5 else 5
-            recomendar_portafolio(capital, riesgo, plazo, top_n)
+            args = [a for a in sys.argv[1:] if not a.startswith("--")]
+            moneda = next((a.split("=", 1)[1].lower() for a in sys.argv[1:] if a.startswith("--moneda=")), MONEDA_BASE)
+            capital = float(args[0])
+            riesgo = args[1].lower()
+            plazo = args[2].lower()
+            top_n = int(args[3]) if len(args) == 4 else 5
+            with ejecucion("modelo_portafolio", riesgo=riesgo, plazo=plazo, top_n=top_n, moneda=moneda):
+                recomendar_portafolio(capital, riesgo, plazo, top_n, simular="--simular" in sys.argv, moneda=moneda)
         except Exception as e:
             print(f"❌ Error: {e}")
-            print("Uso: python modelo_portafolio.py <capital> <riesgo> <plazo> [top_n]")
+            print("Uso: python modelo_portafolio.py <capital> <riesgo> <plazo> [top_n] [--simular] [--moneda=eur]")
     else:
         print("Modo de uso:")
-        print("python modelo_portafolio.py 1000 moderado 30d [top_n]")
\ No newline at end of file
+        print("python modelo_portafolio.py 1000 moderado 30d [top_n] [--simular] [--moneda=eur]")
+        print("python modelo_portafolio.py --lote escenarios.json")
\ No newline at end of file
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.almacen import JSON_FRONTEND, AlmacenCriptos, escribir_atomico, exportar_json  # noqa: E402
+from cryptored.instrumentacion import ejecucion, tramo  # noqa: E402
+from cryptored.versiones import CONSERVAR, RAIZ, AlmacenVersiones  # noqa: E402
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Programador de actualizaciones: extraccion -> features -> entrenamiento o
+# puntuacion -> publicacion, cada --intervalo minutos. Cada ciclo publica en una
+# version nueva (ver cryptored/versiones.py), modelo incluido, y cambia el
+# enlace de la version vigente al final; los lectores nunca esperan ni ven
+# archivos a medias.
+#
+# Un solo ciclo a la vez (candado flock). Si se pide un ciclo mientras otro esta
+# en curso, la peticion queda anotada y se atiende con UN ciclo extra al
+# terminar: varias peticiones seguidas se agrupan en una.
+#   python scripts/programador.py                   -> daemon
+#   python scripts/programador.py --una-vez         -> un ciclo (o lo encola si hay uno en curso)
+#   python scripts/programador.py --ahora           -> pide un ciclo al daemon y sale
+#   python scripts/programador.py --activar <id>    -> vuelve a publicar una version anterior
+
+INTERVALO_MINUTOS = 30
+ENTRENAR_CADA_HORAS = 24
+PAGINAS = 4
+ESPERA_SOLICITUD = 2.0
+RUTA_CANDADO = os.path.join(RAIZ, "programador.lock")
+RUTA_SOLICITUD = os.path.join(RAIZ, "solicitud")
+RUTA_ESTADO = os.path.join(RAIZ, "programador.json")
+
+detener = False
+
+
+class Candado:
+    def __init__(self, ruta: str = RUTA_CANDADO):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self.archivo = open(ruta, "a+")
+        if fcntl is None:
+            print("[WARN] fcntl no disponible: no se evitan ciclos concurrentes entre procesos")
+
+    def tomar(self) -> bool:
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self.archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def soltar(self):
+        if fcntl is not None:
+            fcntl.flock(self.archivo, fcntl.LOCK_UN)
+
+
+# === ESTADO Y SOLICITUDES ===
+def leer_estado() -> dict:
+    try:
+        with open(RUTA_ESTADO, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_estado(estado: dict):
+    def escribir(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=2)
+    escribir_atomico(RUTA_ESTADO, escribir)
+
+
+def solicitar():
+    os.makedirs(RAIZ, exist_ok=True)
+    with open(RUTA_SOLICITUD, "w", encoding="utf-8") as f:
+        f.write(datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+
+def tomar_solicitud() -> bool:
+    try:
+        os.remove(RUTA_SOLICITUD)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def toca_entrenar(estado: dict, cada_horas: float) -> bool:
+    from cryptored.modelado import OUTPUT_MODEL
+
+    if not os.path.exists(OUTPUT_MODEL) or "ultimo_entrenamiento" not in estado:
+        return True
+    return time.time() - estado["ultimo_entrenamiento"] >= cada_horas * 3600
+
+
+# === CICLO ===
+def ciclo(args, versiones: AlmacenVersiones) -> str:
+    import extractor
+    from cryptored.modelado import ARTEFACTOS_MODELO, PUBLICADOS, entrenar_y_publicar, puntuar_y_publicar
+
+    estado = leer_estado()
+    entrenar = toca_entrenar(estado, args.entrenar_cada)
+    with ejecucion("programador", entrenar=entrenar, paginas=args.paginas):
+        if args.paginas > 0:
+            try:
+                # Cada ciclo refresca todo: no se retoma lo que dejo un ciclo fallido.
+                # Sin exportar: el JSON completo sale del almacen dentro de la version,
+                # asi cambia junto con las predicciones en el mismo cambio de enlace
+                extractor.extraer_paginas(1, args.paginas, actualizar=True, reiniciar=True, exportar=False)
+            except Exception as e:
+                # Sin datos nuevos se publica igual con lo que ya hay en el almacen
+                print(f"[ERROR] Fallo la extraccion, se usan los datos guardados: {e}")
+
+        version, tmp = versiones.preparar()
+        try:
+            exportar_json(AlmacenCriptos().leer_registros(), os.path.join(tmp, os.path.basename(JSON_FRONTEND)))
+            if entrenar:
+                entrenar_y_publicar(backend=args.backend, destino=tmp)
+            else:
+                puntuar_y_publicar(destino=tmp)
+        except BaseException:
+            versiones.descartar(version)
+            raise
+        versiones.confirmar(version, {"entrenado": entrenar})
+
+        with tramo("publish", version=version):
+            versiones.espejar({os.path.basename(r): r for r in PUBLICADOS + ARTEFACTOS_MODELO + [JSON_FRONTEND]})
+            podadas = versiones.podar(args.conservar)
+
+    ahora = time.time()
+    estado["ultimo_ciclo"] = ahora
+    estado["ultima_version"] = version
+    if entrenar:
+        estado["ultimo_entrenamiento"] = ahora
+    guardar_estado(estado)
+    print(f"[OK] Version publicada: {version} ({'entrenada' if entrenar else 'puntuada'}, {len(podadas)} podadas)")
+    return version
+
+
+def ciclos_agrupados(args, candado: Candado, versiones: AlmacenVersiones) -> bool:
+    # Corre un ciclo y repite mientras lleguen solicitudes; False si otro proceso tiene el candado
+    if not candado.tomar():
+        solicitar()
+        print("[INFO] Hay un ciclo en curso; la solicitud se atendera al terminar")
+        return False
+    try:
+        while True:
+            tomar_solicitud()
+            try:
+                ciclo(args, versiones)
+            except Exception as e:
+                print(f"[ERROR] Ciclo fallido, sigue vigente la version {versiones.actual()}: {e}")
+            if detener or not os.path.exists(RUTA_SOLICITUD):
+                return True
+    finally:
+        candado.soltar()
+
+
+def activar(version: str, candado: Candado, versiones: AlmacenVersiones) -> bool:
+    # Vuelve a una version conservada: datos y modelo cambian juntos
+    from cryptored.modelado import ARTEFACTOS_MODELO, PUBLICADOS
+
+    if not candado.tomar():
+        print("[ERROR] Hay un ciclo en curso; vuelve a intentarlo al terminar")
+        return False
+    try:
+        versiones.activar(version, {"activada": True})
+        versiones.espejar({os.path.basename(r): r for r in PUBLICADOS + ARTEFACTOS_MODELO + [JSON_FRONTEND]})
+    except ValueError as e:
+        print(f"[ERROR] {e}. Conservadas: {', '.join(versiones.versiones()) or 'ninguna'}")
+        return False
+    finally:
+        candado.soltar()
+    print(f"[OK] Version vigente: {version}")
+    return True
+
+
+def servir(args):
+    global detener
+
+    def parar(*_):
+        global detener
+        detener = True
+        print("[INFO] Deteniendo el programador al terminar el ciclo en curso", flush=True)
+
+    signal.signal(signal.SIGTERM, parar)
+    signal.signal(signal.SIGINT, parar)
+    candado = Candado()
+    versiones = AlmacenVersiones()
+    print(f"[INFO] Programador activo: ciclo cada {args.intervalo} min, entrenamiento cada {args.entrenar_cada} h")
+    proximo = time.monotonic()
+    while not detener:
+        if time.monotonic() >= proximo or os.path.exists(RUTA_SOLICITUD):
+            ciclos_agrupados(args, candado, versiones)
+            proximo = time.monotonic() + args.intervalo * 60
+        time.sleep(ESPERA_SOLICITUD)
+
+
+if __name__ == "__main__":
+    from cryptored.modelado import BACKEND_DEFECTO, BACKENDS
+
+    parser = argparse.ArgumentParser(description="Actualiza y publica los datos en ciclos programados")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--una-vez", action="store_true", help="Corre un ciclo y sale")
+    modo.add_argument("--ahora", action="store_true", help="Pide un ciclo al programador en curso")
+    modo.add_argument("--activar", metavar="VERSION", help="Publica de nuevo una version conservada (datos y modelo)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_MINUTOS, help="Minutos entre ciclos")
+    parser.add_argument(
+        "--entrenar-cada", type=float, default=ENTRENAR_CADA_HORAS,
+        help="Horas entre reentrenamientos; los demas ciclos solo puntuan"
+    )
+    parser.add_argument("--paginas", type=int, default=PAGINAS, help="Paginas de 50 a refrescar (0 no extrae)")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_DEFECTO)
+    parser.add_argument("--conservar", type=int, default=CONSERVAR, help="Versiones publicadas a conservar")
+    args = parser.parse_args()
+
+    if args.ahora:
+        solicitar()
+        print("[OK] Ciclo solicitado")
+    elif args.activar:
+        if not activar(args.activar, Candado(), AlmacenVersiones()):
+            sys.exit(1)
+    elif args.una_vez:
+        ciclos_agrupados(args, Candado(), AlmacenVersiones())
+    else:
+        servir(args)
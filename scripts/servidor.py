@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptored.mercado import MONEDA_BASE
+from cryptored.recomendacion import cargar_recomendadas, top_por_plazo
+from cryptored.versiones import AlmacenVersiones
+from modelo_portafolio import (
+    calcular_escenarios, calcular_portafolio, cargar_criptos, estadisticas_cache, simular_recomendacion,
+    validar_escenarios, validar_parametros
+)
+
+# Servicio HTTP de recomendaciones de larga duracion. Mantiene en memoria el
+# universo puntuado y lo recarga cuando cambia criptos_predichas.json, en lugar
+# de lanzar un interprete de Python por peticion. Si el programador publica
+# versiones (scripts/programador.py) se lee el archivo de la version vigente.
+#   GET /recomendar?capital=1000&riesgo=moderado&plazo=30d[&top_n=5][&metodo=score][&moneda=eur][&simular=1]
+#   POST /recomendar/lote  cuerpo: [{"capital": ..., "riesgo": ..., "plazo": ..., "top_n": ..., "moneda": ...}, ...]
+#   GET /generico?plazo=30d[&top_n=5]
+#   GET /salud  (incluye aciertos/fallos del cache de portafolios)
+
+RUTA_PREDICHAS = "public/data/criptos_predichas.json"
+INTERVALO_RECARGA = 1.0  # segundos entre revisiones del archivo
+MAX_ESCENARIOS = 1000
+
+
+class Universo:
+    def __init__(self, ruta: str = RUTA_PREDICHAS, intervalo: float = INTERVALO_RECARGA):
+        self.ruta = ruta
+        self.versiones = AlmacenVersiones()
+        self.intervalo = intervalo
+        self.lock = threading.Lock()
+        self.firma = None
+        self.revisado = 0.0
+        self.df = None
+        self.recomendadas = []
+        self.cargado = None
+        self.recargas = 0
+        self.recargar()
+
+    def _ruta_vigente(self) -> str:
+        return self.versiones.ruta(os.path.basename(self.ruta)) or self.ruta
+
+    def _firma_archivo(self):
+        ruta = self._ruta_vigente()
+        st = os.stat(ruta)
+        return (ruta, st.st_mtime_ns, st.st_size)
+
+    def recargar(self):
+        firma = self._firma_archivo()
+        ruta = firma[0]
+        df = cargar_criptos(ruta)
+        recomendadas = cargar_recomendadas(ruta)
+        # Se reemplaza la instantanea completa; las peticiones en curso siguen con la anterior
+        self.df, self.recomendadas, self.firma = df, recomendadas, firma
+        self.cargado = time.time()
+        self.recargas += 1
+        print(f"[INFO] Universo cargado: {len(df)} criptos desde {ruta}", flush=True)
+
+    def actual(self):
+        ahora = time.monotonic()
+        if ahora - self.revisado >= self.intervalo and self.lock.acquire(blocking=False):
+            try:
+                self.revisado = ahora
+                if self._firma_archivo() != self.firma:
+                    self.recargar()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[ERROR] No se pudo recargar {self.ruta}: {e}", flush=True)
+            finally:
+                self.lock.release()
+        return self.df, self.recomendadas
+
+
+class ManejadorRecomendaciones(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo van en escrituras separadas; sin esto Nagle agrega ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, estado: int, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        universo = self.server.universo
+        try:
+            if url.path == "/recomendar":
+                faltan = [p for p in ("capital", "riesgo", "plazo") if p not in q]
+                if faltan:
+                    return self._responder(400, {"error": f"Faltan parámetros requeridos: {', '.join(faltan)}"})
+                df, _ = universo.actual()
+                capital, top_n = float(q["capital"]), int(q.get("top_n", 5))
+                validar_parametros(capital, top_n)
+                parametros = (capital, q["riesgo"].lower(), q["plazo"].lower(), top_n, q.get("metodo"))
+                moneda = q.get("moneda", MONEDA_BASE).lower()
+                respuesta = {"recomendaciones": calcular_portafolio(df, *parametros, moneda=moneda)}
+                if q.get("simular") in ("1", "true"):
+                    respuesta["simulacion"] = simular_recomendacion(df, *parametros)
+                return self._responder(200, respuesta)
+            if url.path == "/generico":
+                _, recomendadas = universo.actual()
+                top_n = int(q.get("top_n", 5))
+                if top_n < 1:
+                    raise ValueError("top_n debe ser al menos 1")
+                top = top_por_plazo(q.get("plazo", "30d").lower(), top_n, recomendadas)
+                return self._responder(200, {"recomendaciones": top})
+            if url.path == "/salud":
+                df, _ = universo.actual()
+                return self._responder(200, {
+                    "criptos": len(df), "version": df.attrs.get("version"),
+                    "cargado": universo.cargado, "recargas": universo.recargas,
+                    "cache": estadisticas_cache()
+                })
+        except (ValueError, KeyError) as e:
+            return self._responder(400, {"error": str(e)})
+        except Exception as e:
+            return self._responder(500, {"error": f"Error interno: {e}"})
+        self._responder(404, {"error": "Ruta no encontrada"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/recomendar/lote":
+            return self._responder(404, {"error": "Ruta no encontrada"})
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+            escenarios = json.loads(self.rfile.read(largo) or b"[]")
+            if not isinstance(escenarios, list) or len(escenarios) > MAX_ESCENARIOS:
+                raise ValueError(f"Se espera una lista de hasta {MAX_ESCENARIOS} escenarios")
+            validar_escenarios(escenarios)
+            df, _ = self.server.universo.actual()
+            return self._responder(200, {"resultados": calcular_escenarios(df, escenarios)})
+        except ValueError as e:
+            return self._responder(400, {"error": str(e)})
+        except Exception as e:
+            return self._responder(500, {"error": f"Error interno: {e}"})
+
+
+def crear_servidor(host: str, puerto: int, ruta: str = RUTA_PREDICHAS) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, puerto), ManejadorRecomendaciones)
+    server.daemon_threads = True
+    server.universo = Universo(ruta)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP de recomendaciones de portafolio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--datos", default=RUTA_PREDICHAS, help="JSON de criptos puntuadas")
+    args = parser.parse_args()
+
+    server = crear_servidor(args.host, args.puerto, args.datos)
+    print(f"[INFO] Recomendador escuchando en http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()